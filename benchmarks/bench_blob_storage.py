@@ -0,0 +1,121 @@
+"""Database size and read latency of inline vs. blob chunk storage.
+
+Simulates the usual workload: tasks repeatedly ``read`` and ``explain``
+the same few files, so most chunk bodies are duplicates. The same chunks
+are written once as inline ``chunks.content`` text (the schema before blob
+storage) and once through ``store_blobs``, then both databases are
+vacuumed and measured. Run from the repository root::
+
+    python -m benchmarks.bench_blob_storage --chunks 20000 --files 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from sqlalchemy import insert
+
+from src.jarvis.context_manager import ContextManager
+from src.jarvis.db import Chunk, Task, store_blobs
+
+CHUNKS_PER_TASK = 100
+
+
+def make_files(count: int) -> List[str]:
+    """Python-like sources of 2-16 KB."""
+    rng = random.Random(0)
+    files = []
+    for n in range(count):
+        functions = rng.randint(20, 160)
+        files.append(
+            "".join(
+                f"def handler_{n}_{i}(request):\n    value = request.get('{rng.randint(0, 10**6)}')\n    return value\n\n"
+                for i in range(functions)
+            )
+        )
+    return files
+
+
+def populate(cm: ContextManager, bodies: List[str], inline: bool) -> List[str]:
+    tasks = max(len(bodies) // CHUNKS_PER_TASK, 1)
+    task_ids = [f"task-{i}" for i in range(tasks)]
+
+    def _load() -> None:
+        with cm.engine.begin() as conn:
+            conn.execute(insert(Task), [{"id": t, "prompt": "p", "status": "completed"} for t in task_ids])
+            for start in range(0, len(bodies), 10_000):
+                part = bodies[start : start + 10_000]
+                if inline:
+                    rows = [{"content": body} for body in part]
+                else:
+                    rows = [{"blob_id": blob_id} for blob_id in store_blobs(conn, part)]
+                for offset, row in enumerate(rows):
+                    row["task_id"] = task_ids[(start + offset) % tasks]
+                conn.execute(insert(Chunk), rows)
+        with cm.engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    cm._call(_load)
+    return task_ids
+
+
+def time_op(factory, repeat: int) -> float:
+    """Median latency in milliseconds of awaiting ``factory(i)``."""
+
+    async def _run() -> List[float]:
+        samples = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            await factory(i)
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    return statistics.median(asyncio.run(_run()))
+
+
+def bench(tmp: str, bodies: List[str], inline: bool, repeat: int) -> Dict[str, float]:
+    path = os.path.join(tmp, "inline.db" if inline else "blobs.db")
+    cm = ContextManager(f"sqlite:///{path}")
+    task_ids = populate(cm, bodies, inline)
+    pick = lambda i: task_ids[(i * 7919) % len(task_ids)]
+    results = {
+        "size_mb": os.path.getsize(path) / 1e6,
+        "get_task_history ms": time_op(lambda i: cm.get_task_history(pick(i)), repeat),
+        "get_recent_chunks ms": time_op(lambda i: cm.get_recent_chunks(pick(i), 20_000), repeat),
+        "get_chunks_since ms": time_op(lambda i: cm.get_chunks_since(i * 100, 1000), max(repeat // 5, 3)),
+    }
+    cm.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--files", type=int, default=50, help="distinct bodies the chunks repeat")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    files = make_files(args.files)
+    rng = random.Random(1)
+    bodies = [rng.choice(files) for _ in range(args.chunks)]
+    raw_mb = sum(len(body) for body in bodies) / 1e6
+    print(f"{args.chunks} chunks, {args.files} distinct bodies, {raw_mb:.1f} MB of text")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inline = bench(tmp, bodies, inline=True, repeat=args.repeat)
+        blobs = bench(tmp, bodies, inline=False, repeat=args.repeat)
+    print(f"{'metric':<24}{'inline':>12}{'blobs':>12}")
+    for name in inline:
+        print(f"{name:<24}{inline[name]:>12.2f}{blobs[name]:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
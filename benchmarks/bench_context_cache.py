@@ -0,0 +1,121 @@
+"""Hit rate and latency of the context cache backends.
+
+Serves repeated ``TaskOrchestrator`` turns on one task, the hot path the
+cache is for, without a cache, with ``LRUContextCache`` and with
+``RedisContextCache`` on an in-process stand-in for a Redis server, so no
+server is needed. Coherence is covered by ``tests/test_context_cache.py``.
+Run from the repository root::
+
+    python -m benchmarks.bench_context_cache --turns 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.jarvis.context_cache import ContextCache, LRUContextCache, RedisContextCache
+from src.jarvis.context_manager import ContextManager
+from src.jarvis.orchestrator import TaskOrchestrator
+from src.jarvis.utils.loop import get_runner
+
+SOURCE = '''def add(a, b):
+    return a + b
+'''
+
+
+class FakeRedis:
+    """The subset of the redis-py client ``RedisContextCache`` uses."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if nx and key in self.values:
+            return None
+        self.values[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def incr(self, key: str) -> int:
+        value = int(self.values.get(key, b"0")) + 1
+        self.values[key] = str(value).encode()
+        return value
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match: str) -> List[str]:
+        return [key for key in self.values if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def close(self) -> None:
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.calls: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args, **kwargs: self.calls.append((getattr(self.client, name), args, kwargs))
+
+    def execute(self) -> List[Any]:
+        return [fn(*args, **kwargs) for fn, args, kwargs in self.calls]
+
+
+def bench_turns(tmp: Path, cache: Optional[ContextCache], turns: int) -> Dict[str, float]:
+    source = tmp / "module.py"
+    source.write_text(SOURCE)
+    cm = ContextManager(f"sqlite:///{tmp / f'turns-{type(cache).__name__}.db'}", cache=cache)
+    orchestrator = TaskOrchestrator(cm)
+    task_id = orchestrator.create_task("bench")
+    for n in range(20):
+        get_runner().run(cm.add_chunk(task_id, f"earlier output {n} " * 20))
+    samples = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        orchestrator.handle(task_id, f"explain {source}")
+        samples.append((time.perf_counter() - start) * 1000)
+    cm.close()
+    result = {"median_ms": statistics.median(samples)}
+    if cache is not None:
+        result.update(cache.stats())
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    backends = {
+        "lru": lambda: LRUContextCache(),
+        "redis (stand-in)": lambda: RedisContextCache(client=FakeRedis()),
+    }
+    print(f"{'cache':<20}{'turn ms':>10}{'hits':>8}{'misses':>8}{'hit rate':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in {"none": lambda: None, **backends}.items():
+            result = bench_turns(Path(tmp), factory(), args.turns)
+            print(
+                f"{name:<20}{result['median_ms']:>10.2f}{result.get('hits', 0):>8}"
+                f"{result.get('misses', 0):>8}{result.get('hit_rate', 0.0):>10.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Per-request event loop overhead: ``asyncio.run`` per call vs. a shared loop.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_event_loop --requests 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from src.jarvis.context_manager import ContextManager
+from src.jarvis.utils.loop import LoopRunner
+
+
+def _request_ops(cm: ContextManager, task_id: str):
+    """The three context operations ``execute_workflow`` performs per request."""
+    return (
+        cm.create_task(task_id, "explain foo.py"),
+        cm.add_chunk(task_id, "Simulated response"),
+        cm.update_status(task_id, "completed"),
+    )
+
+
+def bench_asyncio_run(cm: ContextManager, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        for coro in _request_ops(cm, str(uuid.uuid4())):
+            asyncio.run(coro)
+    return time.perf_counter() - start
+
+
+def bench_shared_loop(cm: ContextManager, requests: int) -> float:
+    runner = LoopRunner()
+    start = time.perf_counter()
+    for _ in range(requests):
+        for coro in _request_ops(cm, str(uuid.uuid4())):
+            runner.run(coro)
+    elapsed = time.perf_counter() - start
+    runner.close()
+    return elapsed
+
+
+def bench_empty_coroutines(requests: int) -> tuple[float, float]:
+    """Isolate pure loop overhead with coroutines that do no work."""
+    async def noop() -> None:
+        return None
+
+    start = time.perf_counter()
+    for _ in range(requests * 3):
+        asyncio.run(noop())
+    per_call = time.perf_counter() - start
+
+    runner = LoopRunner()
+    start = time.perf_counter()
+    for _ in range(requests * 3):
+        runner.run(noop())
+    shared = time.perf_counter() - start
+    runner.close()
+    return per_call, shared
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    cm = ContextManager("sqlite://")
+    before = bench_asyncio_run(cm, args.requests)
+    after = bench_shared_loop(cm, args.requests)
+    cm.close()
+    noop_before, noop_after = bench_empty_coroutines(args.requests)
+
+    per_req = lambda total: total / args.requests * 1e6
+    print(f"requests: {args.requests} (3 context operations each)")
+    print(f"{'':24}{'asyncio.run':>14}{'shared loop':>14}")
+    print(f"{'full request (us)':24}{per_req(before):>14.1f}{per_req(after):>14.1f}")
+    print(f"{'loop overhead only (us)':24}{per_req(noop_before):>14.1f}{per_req(noop_after):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
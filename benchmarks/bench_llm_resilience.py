@@ -0,0 +1,100 @@
+"""Tail latency of LLMClient with fake backends: plain fallback vs. hedging.
+
+The fake primary backend usually answers in ``--fast`` seconds but stalls
+for ``--stall`` seconds on ``--stall-rate`` of calls; the fake fallback
+always takes ``--backup`` seconds. A second scenario makes the primary fail
+every call to show the circuit breaker skipping it. Runs offline from the
+repository root::
+
+    python -m benchmarks.bench_llm_resilience --calls 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+
+from src.jarvis.services.llm_client import LLMClient
+from src.jarvis.tier_selector import TierSelector
+
+
+class FakeBackend:
+    def __init__(self, latency: float, stall: float = 0.0, stall_rate: float = 0.0, fail: bool = False) -> None:
+        self.latency = latency
+        self.stall = stall
+        self.stall_rate = stall_rate
+        self.fail = fail
+        self.calls = 0
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.fail:
+            time.sleep(self.latency)
+            raise ConnectionError("backend unavailable")
+        time.sleep(self.stall if random.random() < self.stall_rate else self.latency)
+        return "ok"
+
+
+def run(client: LLMClient, calls: int) -> dict[str, float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client.generate("local", "hello")
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[min(int(len(samples) * 0.99), len(samples) - 1)],
+        "max": samples[-1],
+    }
+
+
+def make_client(primary: FakeBackend, backup: FakeBackend, **kwargs) -> LLMClient:
+    return LLMClient(
+        tier_selector=TierSelector(),
+        ollama=primary,
+        bedrock=backup,
+        chat_model=object(),
+        **kwargs,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--fast", type=float, default=0.01)
+    parser.add_argument("--stall", type=float, default=0.5)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--backup", type=float, default=0.02)
+    args = parser.parse_args()
+    random.seed(0)
+
+    print(f"{'scenario':<28}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, kwargs in (("fallback only", {}), ("hedged at p95", {"hedge": True, "hedge_after": 0.05})):
+        primary = FakeBackend(args.fast, args.stall, args.stall_rate)
+        client = make_client(primary, FakeBackend(args.backup), **kwargs)
+        result = run(client, args.calls)
+        client.close()
+        print(f"{name:<28}{result['p50']:>10.1f}{result['p99']:>10.1f}{result['max']:>10.1f}")
+
+    primary = FakeBackend(args.fast, fail=True)
+    client = make_client(primary, FakeBackend(args.backup), failure_threshold=5)
+    result = run(client, args.calls)
+    client.close()
+    print(f"{'failing primary + breaker':<28}{result['p50']:>10.1f}{result['p99']:>10.1f}{result['max']:>10.1f}")
+    print(f"failing primary called {primary.calls} times for {args.calls} requests")
+
+    primary = FakeBackend(args.stall * 4)
+    client = make_client(primary, FakeBackend(args.stall * 4), timeout=args.stall)
+    start = time.perf_counter()
+    try:
+        client.generate("local", "hello")
+    except TimeoutError as exc:
+        print(f"deadline: {type(exc).__name__} after {(time.perf_counter() - start) * 1000:.0f} ms")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""End-to-end performance suite for the core pipeline, runnable offline.
+
+Uses the stub model built by ``ModelSelector._initialize_model``, so no LLM
+backend is needed. Covers ContextManager operations at several database
+sizes, ``chunk_text``, FileAgent reads and listings, CodeAgent analysis of
+a generated tree, ``WorkflowManager.execute_workflow`` end to end and a
+concurrent load test against ``jarvis.api.main`` over an in-process ASGI
+client. Run from the repository root::
+
+    python -m benchmarks.bench_pipeline --output results.json
+    python -m benchmarks.bench_pipeline --baseline results.json --tolerance 0.2
+
+With ``--baseline`` the run exits with status 1 when any benchmark's median
+is more than ``tolerance`` slower than in the baseline file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from src.jarvis.agents.base import TaskRequest
+from src.jarvis.agents.code import CodeAgent
+from src.jarvis.agents.file import FileAgent
+from src.jarvis.context_manager import ContextManager
+from src.jarvis.db import Chunk, Task, store_blobs
+from src.jarvis.model_selector import ModelSelector
+from src.jarvis.utils.chunker import chunk_text
+from src.jarvis.utils.loop import get_runner
+from src.jarvis.workflow_manager import WorkflowManager
+
+Result = Dict[str, float]
+
+CHUNKS_PER_TASK = 100
+PYTHON_SOURCE = '''"""Generated module."""
+
+import os
+
+
+class Widget:
+    # A comment line.
+    def __init__(self, name):
+        self.name = name
+
+    def render(self):
+        return f"<{self.name}>"
+
+
+def helper(values):
+    total = 0
+    for value in values:
+        total += value  # running total
+    return total
+'''
+
+
+def summarize(samples: List[float]) -> Result:
+    """Latency summary in milliseconds of ``samples`` given in seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "median_ms": statistics.median(ms),
+        "p95_ms": ms[min(int(len(ms) * 0.95), len(ms) - 1)],
+        "min_ms": ms[0],
+        "runs": len(ms),
+    }
+
+
+def measure(fn: Callable[[int], Any], repeat: int, warmup: int = 1) -> Result:
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def measure_async(factory: Callable[[int], Awaitable[Any]], repeat: int) -> Result:
+    runner = get_runner()
+
+    async def _run() -> List[float]:
+        await factory(0)
+        samples = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            await factory(i)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return summarize(runner.run(_run()))
+
+
+def populate(cm: ContextManager, chunks: int) -> List[str]:
+    tasks = max(chunks // CHUNKS_PER_TASK, 1)
+    task_ids = [f"task-{i}" for i in range(tasks)]
+
+    def _load() -> None:
+        with cm.engine.begin() as conn:
+            conn.execute(
+                insert(Task),
+                [{"id": t, "prompt": "p", "status": ("pending", "completed")[i % 2]} for i, t in enumerate(task_ids)],
+            )
+            for start in range(0, chunks, 50_000):
+                numbers = range(start, min(start + 50_000, chunks))
+                blob_ids = store_blobs(conn, [f"chunk {n} " + "x" * 64 for n in numbers])
+                conn.execute(
+                    insert(Chunk),
+                    [{"task_id": task_ids[n % tasks], "blob_id": b} for n, b in zip(numbers, blob_ids)],
+                )
+
+    cm._call(_load)
+    return task_ids
+
+
+def bench_context_manager(tmp: Path, sizes: List[int], repeat: int) -> Dict[str, Result]:
+    results = {}
+    for size in sizes:
+        cm = ContextManager(f"sqlite:///{tmp / f'cm-{size}.db'}")
+        task_ids = populate(cm, size)
+        pick = lambda i: task_ids[(i * 7919) % len(task_ids)]
+        ops = {
+            "create_task": lambda i: cm.create_task(f"new-{size}-{i}-{time.perf_counter_ns()}", "p"),
+            "add_chunk": lambda i: cm.add_chunk(pick(i), "appended chunk"),
+            "get_chunks": lambda i: cm.get_chunks(pick(i)),
+            "get_recent_chunks": lambda i: cm.get_recent_chunks(pick(i), 2000),
+            "list_tasks(status)": lambda i: cm.list_tasks(status="pending"),
+        }
+        for name, factory in ops.items():
+            runs = repeat if name != "list_tasks(status)" else max(repeat // 10, 3)
+            results[f"context_manager.{name}[{size}]"] = measure_async(factory, runs)
+        cm.close()
+    return results
+
+
+def bench_chunk_text(repeat: int) -> Dict[str, Result]:
+    text = ("lorem ipsum dolor sit amet " * 40 + "\n") * 1000  # ~1 MB
+    return {"chunk_text[1MB]": measure(lambda i: chunk_text(text, 1024), repeat)}
+
+
+def build_tree(root: Path, files: int, per_dir: int = 100) -> None:
+    for n in range(files):
+        directory = root / f"pkg{n // per_dir}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"module{n}.py").write_text(PYTHON_SOURCE)
+
+
+def bench_file_agent(tmp: Path, repeat: int) -> Dict[str, Result]:
+    agent = FileAgent()
+    big = tmp / "big.log"
+    with big.open("w") as f:
+        for n in range(200_000):
+            f.write(f"{n:08d} INFO request handled in {n % 97} ms\n")
+    listing = tmp / "listing"
+    listing.mkdir()
+    for n in range(5000):
+        (listing / f"file{n}.txt").write_text("x")
+
+    def call(content: str) -> Callable[[int], Any]:
+        return lambda i: agent.handle(TaskRequest(task_id="bench", content=content))
+
+    return {
+        "file_agent.read[1MB]": measure(call(f"read {big}"), repeat),
+        "file_agent.head": measure(call(f"head {big} 50"), repeat),
+        "file_agent.tail": measure(call(f"tail {big} 50"), repeat),
+        "file_agent.list[5000]": measure(call(f"list {listing}"), repeat),
+    }
+
+
+def bench_code_agent(tmp: Path, files: int, repeat: int) -> Dict[str, Result]:
+    tree = tmp / "tree"
+    build_tree(tree, files)
+    selector = ModelSelector()
+    agent = CodeAgent(None, selector)
+
+    def cold(i: int) -> None:
+        # An emptied analysis cache; the worker pool stays up across requests.
+        agent.analysis_cache.entries.clear()
+        agent._analyze_code(str(tree))
+
+    try:
+        return {
+            f"code_agent.analyze_cold[{files}]": measure(cold, max(repeat // 10, 3)),
+            f"code_agent.analyze_warm[{files}]": measure(lambda i: agent._analyze_code(str(tree)), repeat),
+        }
+    finally:
+        agent.close()
+
+
+def bench_workflow(tmp: Path, repeat: int) -> Dict[str, Result]:
+    source = tmp / "module.py"
+    source.write_text(PYTHON_SOURCE)
+    cm = ContextManager(f"sqlite:///{tmp / 'workflow.db'}")
+    wm = WorkflowManager(cm)
+    results = {
+        "workflow.explain": measure(lambda i: wm.execute_workflow(f"explain {source}"), repeat),
+        "workflow.read": measure(lambda i: wm.execute_workflow(f"read {source}"), repeat),
+    }
+    cm.close()
+    return results
+
+
+def bench_api(tmp: Path, clients: int, requests: int) -> Dict[str, Result]:
+    import httpx
+
+    # The API module opens ./jarvis.db on import, so import it from ``tmp``.
+    cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        from src.jarvis.api.main import app, planner
+    finally:
+        os.chdir(cwd)
+    source = tmp / "api_module.py"
+    source.write_text(PYTHON_SOURCE)
+
+    async def _run() -> Dict[str, Result]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            latencies: List[float] = []
+            queue: asyncio.Queue = asyncio.Queue()
+            for n in range(requests):
+                queue.put_nowait(n)
+
+            async def worker() -> None:
+                while True:
+                    try:
+                        queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    start = time.perf_counter()
+                    created = await client.post("/tasks/create", json={"prompt": "bench"})
+                    task_id = created.json()["task_id"]
+                    response = await client.post(f"/tasks/{task_id}", json={"content": f"read {source}"})
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(clients)))
+            elapsed = time.perf_counter() - start
+        result = summarize(latencies)
+        result["requests_per_s"] = requests / elapsed
+        return {f"api.create_and_handle[c={clients}]": result}
+
+    try:
+        return get_runner().run(_run())
+    finally:
+        planner.context_manager.close()
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result], tolerance: float) -> List[str]:
+    """Print a comparison table and return the names of regressed benchmarks."""
+    regressions = []
+    print(f"\n{'benchmark':<48}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<48}{'-':>14}{result['median_ms']:>14.3f}{'new':>10}")
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<48}{base['median_ms']:>14.3f}{result['median_ms']:>14.3f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="chunks per database")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--code-files", type=int, default=500)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed median slowdown")
+    parser.add_argument("--quick", action="store_true", help="small sizes for a smoke run")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.repeat, args.code_files, args.requests = [1_000], 5, 40, 40
+
+    results: Dict[str, Result] = {}
+    with tempfile.TemporaryDirectory() as name:
+        tmp = Path(name)
+        sections = [
+            ("context_manager", lambda: bench_context_manager(tmp, args.sizes, args.repeat)),
+            ("chunk_text", lambda: bench_chunk_text(args.repeat)),
+            ("file_agent", lambda: bench_file_agent(tmp, args.repeat)),
+            ("code_agent", lambda: bench_code_agent(tmp, args.code_files, args.repeat)),
+            ("workflow", lambda: bench_workflow(tmp, args.repeat)),
+            ("api", lambda: bench_api(tmp, args.clients, args.requests)),
+        ]
+        for section, run in sections:
+            print(f"running {section}...", file=sys.stderr)
+            for bench_name, result in run().items():
+                results[bench_name] = result
+                print(f"{bench_name:<48}{result['median_ms']:>10.3f} ms  (p95 {result['p95_ms']:.3f} ms)")
+
+    if args.output:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "args": vars(args),
+            },
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""CLI startup guard: import cost and wall-clock time of quick commands.
+
+Fails (exit status 1) when importing ``src.jarvis.cli`` pulls in a heavy
+module or exceeds the import budget. ``tests/test_startup.py`` enforces
+the heavy-module rule in the test suite; this script adds the timings.
+Run from the repository root::
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Modules that must only be imported once a command actually needs them.
+HEAVY_MODULES = (
+    "sqlalchemy",
+    "sqlmodel",
+    "langchain",
+    "langchain_community",
+    "boto3",
+    "chromadb",
+    "numpy",
+    "requests",
+    "rich.markdown",
+)
+
+
+def import_profile(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, via -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            profile[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return profile
+
+
+def time_command(args: list[str], runs: int, cwd: str) -> float:
+    """Median wall-clock seconds of ``python -m src.jarvis.cli <args>``."""
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "src.jarvis.cli", *args],
+            cwd=cwd,
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--import-budget-ms", type=float, default=150.0,
+        help="maximum cumulative import time of src.jarvis.cli",
+    )
+    args = parser.parse_args()
+
+    profile = import_profile("src.jarvis.cli")
+    cli_ms = profile.get("src.jarvis.cli", 0) / 1000
+    heavy_roots = sorted(name for name in profile if name in HEAVY_MODULES)
+
+    with tempfile.TemporaryDirectory() as cwd:
+        help_s = time_command(["--help"], args.runs, cwd)
+        list_s = time_command(["main", "list"], args.runs, cwd)
+
+    print(f"import src.jarvis.cli: {cli_ms:.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"heavy modules imported: {', '.join(heavy_roots) or 'none'}")
+    print(f"cli --help: {help_s * 1000:.0f} ms median over {args.runs} runs")
+    print(f"cli list:   {list_s * 1000:.0f} ms median over {args.runs} runs")
+
+    failures = []
+    if heavy_roots:
+        failures.append(f"heavy modules imported at startup: {', '.join(heavy_roots)}")
+    if cli_ms > args.import_budget_ms:
+        failures.append(f"import time {cli_ms:.1f} ms exceeds {args.import_budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
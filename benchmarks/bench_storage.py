@@ -0,0 +1,104 @@
+"""Query latency of hot ContextManager reads at growing chunk counts.
+
+Compares SQLite defaults without indexes (the original schema) against the
+``production`` storage profile with the migrated indexes. Run from the
+repository root::
+
+    python -m benchmarks.bench_storage --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+
+from src.jarvis.context_manager import ContextManager
+from src.jarvis.db import Chunk, Task, store_blobs
+
+CHUNKS_PER_TASK = 100
+
+
+def populate(cm: ContextManager, chunks: int) -> list[str]:
+    tasks = max(chunks // CHUNKS_PER_TASK, 1)
+    task_ids = [f"task-{i}" for i in range(tasks)]
+    statuses = ("pending", "completed", "failed")
+
+    def _load() -> None:
+        with cm.engine.begin() as conn:
+            conn.execute(
+                insert(Task),
+                [{"id": t, "prompt": "p", "status": statuses[i % 3]} for i, t in enumerate(task_ids)],
+            )
+            # Interleave tasks so each task's chunks are spread across the table.
+            for start in range(0, chunks, 50_000):
+                numbers = range(start, min(start + 50_000, chunks))
+                blob_ids = store_blobs(conn, [f"chunk {n} " + "x" * 64 for n in numbers])
+                conn.execute(
+                    insert(Chunk),
+                    [{"task_id": task_ids[n % tasks], "blob_id": b} for n, b in zip(numbers, blob_ids)],
+                )
+
+    cm._call(_load)
+    return task_ids
+
+
+def drop_indexes(cm: ContextManager) -> None:
+    def _drop() -> None:
+        with cm.engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX IF EXISTS ix_chunks_task_id_id")
+            conn.exec_driver_sql("DROP INDEX IF EXISTS ix_tasks_status")
+
+    cm._call(_drop)
+
+
+def time_op(factory, repeat: int) -> float:
+    """Median latency in milliseconds of awaiting ``factory()``."""
+    async def _run() -> list[float]:
+        samples = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            await factory(i)
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+
+    return statistics.median(asyncio.run(_run()))
+
+
+def bench(size: int, profile: str, indexed: bool, repeat: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        cm = ContextManager(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile=profile)
+        if not indexed:
+            drop_indexes(cm)
+        task_ids = populate(cm, size)
+        pick = lambda i: task_ids[(i * 7919) % len(task_ids)]
+        results = {
+            "get_chunks": time_op(lambda i: cm.get_chunks(pick(i)), repeat),
+            "get_task_history": time_op(lambda i: cm.get_task_history(pick(i)), repeat),
+            "list_tasks(status)": time_op(lambda i: cm.list_tasks(status="failed"), max(repeat // 10, 3)),
+        }
+        cm.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'chunks':>10}  {'operation':<20}{'baseline ms':>14}{'production ms':>15}")
+    for size in args.sizes:
+        baseline = bench(size, "default", indexed=False, repeat=args.repeat)
+        production = bench(size, "production", indexed=True, repeat=args.repeat)
+        for op in baseline:
+            print(f"{size:>10}  {op:<20}{baseline[op]:>14.2f}{production[op]:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
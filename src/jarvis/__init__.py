@@ -1,10 +1,17 @@
 """Minimal Jarvis-style multi-agent system."""
 
 # Avoid importing heavy dependencies at module import time so that utilities
-# like the CLI can run even if optional requirements are missing.
-try:  # pragma: no cover - import may fail if dependencies aren't installed
-    from .orchestrator import TaskOrchestrator
-except Exception:  # pragma: no cover - gracefully handle missing deps
-    TaskOrchestrator = None  # type: ignore[assignment]
-
+# like the CLI can run even if optional requirements are missing. The
+# orchestrator is only imported when it is first accessed.
 __all__ = ["TaskOrchestrator"]
+
+
+def __getattr__(name: str):
+    if name == "TaskOrchestrator":
+        try:  # pragma: no cover - import may fail if dependencies aren't installed
+            from .orchestrator import TaskOrchestrator
+        except Exception:  # pragma: no cover - gracefully handle missing deps
+            TaskOrchestrator = None  # type: ignore[assignment]
+        globals()["TaskOrchestrator"] = TaskOrchestrator
+        return TaskOrchestrator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
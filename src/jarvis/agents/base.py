@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
 class TaskRequest:
     task_id: str
     content: str
+    # Prompt-ready task history assembled by the orchestrator, if any.
+    context: Optional[str] = None
 
 
 @dataclass
@@ -16,7 +19,14 @@ class TaskResponse:
 
 
 class Agent(ABC):
-    """Base interface for all agents."""
+    """Base interface for all agents.
+
+    Agents that read ``TaskRequest.context`` set ``uses_context``; the
+    orchestrator only assembles context for those.
+    """
+
+    uses_context = False
+
     def __init__(self, *args, **kwargs):
         """Initialize the agent with any necessary parameters."""
         pass
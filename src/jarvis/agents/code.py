@@ -1,19 +1,151 @@
 from __future__ import annotations
 
+import glob
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from .base import Agent, TaskRequest, TaskResponse
 
+# File types picked up when a directory is analyzed.
+SOURCE_SUFFIXES = {".py", ".pyi"}
+# Below this many files to (re)analyze, a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 32
+
+
+@dataclass
+class FileMetrics:
+    total: int = 0
+    code: int = 0
+    comment: int = 0
+    empty: int = 0
+
+    def __iadd__(self, other: "FileMetrics") -> "FileMetrics":
+        self.total += other.total
+        self.code += other.code
+        self.comment += other.comment
+        self.empty += other.empty
+        return self
+
+
+def analyze_file(path: str) -> FileMetrics:
+    """Count line kinds in one pass over the file's bytes."""
+    metrics = FileMetrics()
+    with open(path, "rb") as handle:
+        for line in handle:
+            stripped = line.strip()
+            metrics.total += 1
+            if not stripped:
+                metrics.empty += 1
+            elif stripped.startswith(b"#"):
+                metrics.comment += 1
+    metrics.code = metrics.total - metrics.empty - metrics.comment
+    return metrics
+
+
+def _is_glob(pattern: str) -> bool:
+    return any(ch in pattern for ch in "*?[")
+
+
+def expand_targets(target: str) -> List[str]:
+    """Resolve a file, directory or glob pattern into source file paths."""
+    if _is_glob(target):
+        return sorted(p for p in glob.glob(target, recursive=True) if os.path.isfile(p))
+    path = Path(target)
+    if path.is_dir():
+        files = []
+        for root, dirs, names in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d != "__pycache__"]
+            files.extend(
+                os.path.join(root, name)
+                for name in names
+                if os.path.splitext(name)[1] in SOURCE_SUFFIXES
+            )
+        return sorted(files)
+    return [target] if path.is_file() else []
+
+
+class AnalysisCache:
+    """Per-file metrics keyed by path and validated against (size, mtime).
+
+    Optionally persisted as JSON so unchanged files are skipped across runs.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.entries: Dict[str, Tuple[int, int, FileMetrics]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    raw = json.load(handle)
+                self.entries = {
+                    key: (size, mtime, FileMetrics(**metrics))
+                    for key, (size, mtime, metrics) in raw.items()
+                }
+            except (OSError, ValueError, TypeError):
+                self.entries = {}
+
+    @staticmethod
+    def _stamp(path: str) -> Tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: str, stamp: Tuple[int, int]) -> Optional[FileMetrics]:
+        entry = self.entries.get(os.path.abspath(path))
+        if entry and entry[:2] == stamp:
+            return entry[2]
+        return None
+
+    def put(self, path: str, stamp: Tuple[int, int], metrics: FileMetrics) -> None:
+        self.entries[os.path.abspath(path)] = (stamp[0], stamp[1], metrics)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        data = {key: [size, mtime, asdict(m)] for key, (size, mtime, m) in self.entries.items()}
+        # A private temp file per save, so concurrent saves cannot clobber
+        # each other's file before it is renamed into place.
+        directory, name = os.path.split(os.path.abspath(self.path))
+        handle = tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=directory, prefix=f"{name}.", suffix=".tmp", delete=False
+        )
+        try:
+            with handle:
+                json.dump(data, handle)
+            os.replace(handle.name, self.path)
+        except BaseException:
+            os.unlink(handle.name)
+            raise
+
 
 class CodeAgent(Agent):
     """Agent that performs code analysis, explanation and refactoring."""
 
-    def __init__(self, context_manager, model_selector, *args, **kwargs) -> None:
+    uses_context = True
+
+    def __init__(
+        self,
+        context_manager,
+        model_selector,
+        *args,
+        max_workers: Optional[int] = None,
+        cache_path: Optional[str] = None,
+        **kwargs,
+    ) -> None:
         """Create the agent with a context manager and model selector."""
         super().__init__(*args, **kwargs)
         self.context_manager = context_manager
         self.model_selector = model_selector
+        self.max_workers = max_workers
+        self.analysis_cache = AnalysisCache(cache_path)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
 
     def handle(self, request: TaskRequest) -> TaskResponse:
         parts = request.content.split(maxsplit=1)
@@ -28,36 +160,98 @@ class CodeAgent(Agent):
         elif command == "refactor" and argument:
             return self._refactor_code(argument)
         elif command == "explain" and argument:
-            return self._explain_code(argument)
+            return self._explain_code(argument, request.context)
         else:
             return TaskResponse(content="Unknown code command. Supported commands: analyze, refactor, explain")
 
-    def _analyze_code(self, file_path: str) -> TaskResponse:
-        """Analyze code in a file and provide insights."""
-        path = Path(file_path)
-        if not path.exists():
-            return TaskResponse(content=f"File {file_path} not found")
-            
+    def _analyze_code(self, target: str) -> TaskResponse:
+        """Analyze a file, directory or glob and provide insights."""
+        files = expand_targets(target)
+        if not files:
+            return TaskResponse(content=f"File {target} not found")
+
         try:
-            text = path.read_text()
-            # Basic analysis
-            lines = text.splitlines()
-            total_lines = len(lines)
-            empty_lines = sum(1 for line in lines if not line.strip())
-            comment_lines = sum(1 for line in lines if line.strip().startswith('#'))
-            code_lines = total_lines - empty_lines - comment_lines
-            
-            analysis = f"""Code Analysis for {file_path}:
-- Total lines: {total_lines}
-- Code lines: {code_lines}
-- Comment lines: {comment_lines}
-- Empty lines: {empty_lines}
-- Code to comment ratio: {code_lines/max(comment_lines, 1):.2f}
-"""
-            return TaskResponse(content=analysis)
+            results = self._collect_metrics(files)
         except Exception as e:
             return TaskResponse(content=f"Error analyzing code: {str(e)}")
 
+        if len(files) == 1 and not Path(target).is_dir() and not _is_glob(target):
+            return TaskResponse(content=self._format_file_report(target, results[0][1]))
+        return TaskResponse(content=self._format_repo_report(target, results))
+
+    def _collect_metrics(self, files: List[str]) -> List[Tuple[str, FileMetrics]]:
+        """Return metrics for ``files``, analyzing only uncached ones."""
+        results: Dict[str, FileMetrics] = {}
+        stale: List[Tuple[str, Tuple[int, int]]] = []
+        for path in files:
+            stamp = AnalysisCache._stamp(path)
+            cached = self.analysis_cache.get(path, stamp)
+            if cached is None:
+                stale.append((path, stamp))
+            else:
+                results[path] = cached
+
+        paths = [path for path, _ in stale]
+        for (path, stamp), metrics in zip(stale, self._run_analysis(paths)):
+            self.analysis_cache.put(path, stamp, metrics)
+            results[path] = metrics
+        if stale:
+            self.analysis_cache.save()
+        return [(path, results[path]) for path in files]
+
+    def _run_analysis(self, paths: List[str]) -> Iterable[FileMetrics]:
+        if len(paths) < PARALLEL_THRESHOLD:
+            return [analyze_file(path) for path in paths]
+        workers = self.max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(paths) // (workers * 4))
+        return list(self._process_pool().map(analyze_file, paths, chunksize=chunksize))
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        """The agent's worker pool, started on first use and kept for later requests."""
+        with self._pool_lock:
+            if self._pool is None:
+                # Forking would copy the DB and event-loop threads' locks mid-use.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def close(self) -> None:
+        """Shut down the analysis worker pool, if one was started."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    @staticmethod
+    def _format_file_report(file_path: str, m: FileMetrics) -> str:
+        return f"""Code Analysis for {file_path}:
+- Total lines: {m.total}
+- Code lines: {m.code}
+- Comment lines: {m.comment}
+- Empty lines: {m.empty}
+- Code to comment ratio: {m.code/max(m.comment, 1):.2f}
+"""
+
+    @staticmethod
+    def _format_repo_report(target: str, results: List[Tuple[str, FileMetrics]], top: int = 10) -> str:
+        totals = FileMetrics()
+        for _, metrics in results:
+            totals += metrics
+        largest = sorted(results, key=lambda item: item[1].code, reverse=True)[:top]
+        lines = [
+            f"Code Analysis for {target}:",
+            f"- Files: {len(results)}",
+            f"- Total lines: {totals.total}",
+            f"- Code lines: {totals.code}",
+            f"- Comment lines: {totals.comment}",
+            f"- Empty lines: {totals.empty}",
+            f"- Code to comment ratio: {totals.code/max(totals.comment, 1):.2f}",
+            "- Largest files by code lines:",
+        ]
+        lines.extend(f"  - {path}: {metrics.code}" for path, metrics in largest)
+        return "\n".join(lines) + "\n"
+
     def _refactor_code(self, file_path: str) -> TaskResponse:
         """Refactor code in a file."""
         path = Path(file_path)
@@ -73,7 +267,7 @@ class CodeAgent(Agent):
         except Exception as e:
             return TaskResponse(content=f"Error refactoring code: {str(e)}")
 
-    def _explain_code(self, file_path: str) -> TaskResponse:
+    def _explain_code(self, file_path: str, context: Optional[str] = None) -> TaskResponse:
         """Generate an explanation for the given source file."""
         path = Path(file_path)
         if not path.exists():
@@ -85,7 +279,7 @@ class CodeAgent(Agent):
             return TaskResponse(content=f"Error reading file: {str(e)}")
 
         try:
-            explanation = self.model_selector.explain_code(code)
+            explanation = self.model_selector.explain_code(code, context=context)
         except Exception as e:  # pragma: no cover - llm failures
             return TaskResponse(content=f"LLM error: {str(e)}")
 
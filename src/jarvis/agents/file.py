@@ -1,15 +1,48 @@
 from __future__ import annotations
 
+import codecs
 import os
+import re
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from .base import Agent, TaskRequest, TaskResponse
 
+# Bytes inspected to pick an encoding before decoding the whole read.
+SAMPLE_SIZE = 4096
+# Largest number of bytes a single read returns unless configured otherwise.
+DEFAULT_MAX_READ_BYTES = 1024 * 1024
+DEFAULT_LINES = 10
+_BLOCK_SIZE = 8192
+_LEADING_READ_OPTION = re.compile(r"--(offset|limit)\s+(\S+)(?:\s+|$)")
+_TRAILING_READ_OPTION = re.compile(r"(?:^|\s+)--(offset|limit)\s+(\S+)\s*$")
+
+
+def _detect_encoding(sample: bytes) -> str:
+    """Guess the encoding of a file from a prefix of its bytes."""
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # The sample may end mid-character, so decode it incrementally.
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin1"
+
+
+def _decode(data: bytes, encoding: str, final: bool = True) -> str:
+    """Decode ``data`` once; invalid bytes past the sample are replaced."""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    return decoder.decode(data, final=final)
+
 
 class FileAgent(Agent):
     """Agent for simple file operations."""
 
+    def __init__(self, *args, max_read_bytes: int = DEFAULT_MAX_READ_BYTES, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_read_bytes = max_read_bytes
+
     def handle(self, request: TaskRequest) -> TaskResponse:
         parts = request.content.split(maxsplit=1)
 
@@ -19,35 +52,169 @@ class FileAgent(Agent):
         argument: Optional[str] = parts[1] if len(parts) > 1 else None
 
         if command == "read" and argument:
-            return self._read_file(argument)
+            try:
+                file_path, offset, limit = self._parse_read_args(argument)
+            except ValueError as e:
+                return TaskResponse(content=f"Invalid read arguments: {str(e)}")
+            return self._read_file(file_path, offset, limit)
+        if command in ("head", "tail") and argument:
+            file_path, count = self._parse_line_args(argument)
+            if command == "head":
+                return self._head_file(file_path, count)
+            return self._tail_file(file_path, count)
         if command == "write" and argument:
             name, _, body = argument.partition(" ")
             return self._write_file(name, body)
         if command == "list" and argument:
             return self._list_directory(argument)
-        return TaskResponse(content="Unknown file command. Supported commands: read, write, list")
+        return TaskResponse(
+            content="Unknown file command. Supported commands: read, head, tail, write, list"
+        )
+
+    @staticmethod
+    def _parse_read_args(argument: str) -> Tuple[str, int, Optional[int]]:
+        """Parse ``path [--offset N] [--limit M]``.
+
+        Options are taken from either end of the argument; the rest is the
+        path, kept verbatim (backslashes, apostrophes and spaces included)
+        apart from one pair of surrounding quotes.
+        """
+        leading: List[Tuple[str, str]] = []
+        trailing: List[Tuple[str, str]] = []
+        rest = argument.strip()
+        match = _LEADING_READ_OPTION.match(rest)
+        while match:
+            leading.append((match.group(1), match.group(2)))
+            rest = rest[match.end():]
+            match = _LEADING_READ_OPTION.match(rest)
+        match = _TRAILING_READ_OPTION.search(rest)
+        while match:
+            trailing.append((match.group(1), match.group(2)))
+            rest = rest[: match.start()]
+            match = _TRAILING_READ_OPTION.search(rest)
+        offset, limit = 0, None
+        # Applied left to right, so a repeated option keeps its last value.
+        for name, raw in leading + trailing[::-1]:
+            value = int(raw)
+            if value < 0:
+                raise ValueError(f"--{name} must not be negative")
+            if name == "offset":
+                offset = value
+            else:
+                limit = value
+        path = rest.strip()
+        if len(path) >= 2 and path[0] == path[-1] and path[0] in "'\"":
+            path = path[1:-1]
+        return path, offset, limit
 
-    def _read_file(self, file_path: str) -> TaskResponse:
-        """Read a file with proper encoding handling."""
+    @staticmethod
+    def _parse_line_args(argument: str) -> Tuple[str, int]:
+        """Parse ``path [N]`` for head/tail."""
+        path, _, count = argument.rpartition(" ")
+        if path and count.isdigit():
+            return path, int(count)
+        return argument, DEFAULT_LINES
+
+    def _read_file(self, file_path: str, offset: int = 0, limit: Optional[int] = None) -> TaskResponse:
+        """Read up to ``limit`` bytes starting at ``offset`` in a single pass.
+
+        The encoding is detected from a prefix sample and the bytes are
+        decoded once. Reads are capped at ``max_read_bytes``; a note is
+        appended when the output does not reach the end of the file.
+        """
         path = Path(file_path)
         if not path.exists():
             return TaskResponse(content=f"File {file_path} not found")
-            
-        # Try different encodings
-        encodings = ['utf-8', 'utf-8-sig', 'latin1', 'cp1252']
-        last_error = None
-        
-        for encoding in encodings:
-            try:
-                content = path.read_text(encoding=encoding)
-                return TaskResponse(content=content)
-            except UnicodeDecodeError as e:
-                last_error = e
-                continue
-            except Exception as e:
-                return TaskResponse(content=f"Error reading file: {str(e)}")
-                
-        return TaskResponse(content=f"Could not decode file with any of the attempted encodings. Last error: {str(last_error)}")
+
+        try:
+            size = path.stat().st_size
+            length = min(limit if limit is not None else size, self.max_read_bytes)
+            with path.open("rb") as handle:
+                if offset:
+                    sample = handle.read(SAMPLE_SIZE)
+                    handle.seek(offset)
+                data = handle.read(length)
+            if not offset:
+                sample = data[:SAMPLE_SIZE]
+        except Exception as e:
+            return TaskResponse(content=f"Error reading file: {str(e)}")
+
+        encoding = _detect_encoding(sample)
+        if offset and encoding.startswith("utf-8"):
+            # A ranged read may start inside a multi-byte character.
+            encoding = "utf-8"
+            skip = 0
+            while skip < min(len(data), 3) and data[skip] & 0xC0 == 0x80:
+                skip += 1
+            data = data[skip:]
+        end = min(offset, size) + len(data)
+        content = _decode(data, encoding, final=end >= size)
+
+        requested_end = size if limit is None else min(offset + limit, size)
+        if end < requested_end:
+            content += (
+                f"\n[truncated: showing bytes {offset}-{end} of {size}; "
+                "use --offset/--limit to read more]"
+            )
+        return TaskResponse(content=content)
+
+    def _head_file(self, file_path: str, count: int) -> TaskResponse:
+        """Return the first ``count`` lines without reading the rest of the file."""
+        path = Path(file_path)
+        if not path.exists():
+            return TaskResponse(content=f"File {file_path} not found")
+
+        try:
+            lines: List[bytes] = []
+            budget = self.max_read_bytes
+            with path.open("rb") as handle:
+                while len(lines) < count and budget > 0:
+                    line = handle.readline(budget)
+                    if not line:
+                        break
+                    lines.append(line)
+                    budget -= len(line)
+        except Exception as e:
+            return TaskResponse(content=f"Error reading file: {str(e)}")
+
+        data = b"".join(lines)
+        return TaskResponse(content=_decode(data, _detect_encoding(data[:SAMPLE_SIZE])))
+
+    def _tail_file(self, file_path: str, count: int) -> TaskResponse:
+        """Return the last ``count`` lines by reading backwards from the end."""
+        path = Path(file_path)
+        if not path.exists():
+            return TaskResponse(content=f"File {file_path} not found")
+
+        try:
+            with path.open("rb") as handle:
+                sample = handle.read(SAMPLE_SIZE)
+                position = handle.seek(0, os.SEEK_END)
+                blocks: List[bytes] = []
+                read = 0
+                newlines = 0
+                # One extra newline is needed to know where the first line starts.
+                while position > 0 and newlines <= count and read < self.max_read_bytes:
+                    step = min(_BLOCK_SIZE, position, self.max_read_bytes - read)
+                    position -= step
+                    handle.seek(position)
+                    block = handle.read(step)
+                    blocks.append(block)
+                    read += step
+                    newlines += block.count(b"\n")
+        except Exception as e:
+            return TaskResponse(content=f"Error reading file: {str(e)}")
+
+        data = b"".join(reversed(blocks))
+        lines = data.splitlines(keepends=True)
+        if position > 0 and lines:
+            # The first line is partial unless we reached the start of the file.
+            lines = lines[1:]
+        data = b"".join(lines[-count:] if count else [])
+        encoding = _detect_encoding(sample)
+        if encoding == "utf-8-sig" and position > 0:
+            encoding = "utf-8"
+        return TaskResponse(content=_decode(data, encoding))
 
     def _write_file(self, file_path: str, content: str) -> TaskResponse:
         """Write content to a file."""
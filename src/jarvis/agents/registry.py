@@ -0,0 +1,218 @@
+"""Agent registry and the routing engine that picks an agent for a request."""
+
+from __future__ import annotations
+
+import importlib
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .base import Agent
+
+# A factory is called as ``factory(context_manager, model_selector)``; a
+# "module:attribute" string is imported the first time the agent is needed
+# (relative module names resolve against this package).
+AgentFactory = Union[str, Callable[..., Agent]]
+
+
+@dataclass(frozen=True)
+class AgentSpec:
+    name: str
+    factory: AgentFactory
+    patterns: tuple
+    priority: int = 0
+    regex: bool = False
+
+
+def _resolve(factory: AgentFactory) -> Callable[..., Agent]:
+    if callable(factory):
+        return factory
+    module, _, attr = factory.partition(":")
+    return getattr(importlib.import_module(module, package=__package__), attr)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex matching any of ``words``, factored into a prefix trie.
+
+    Sharing prefixes means each input position is tested against the set of
+    possible next characters rather than against every keyword in turn.
+    Optional suffixes are greedy, so the longest keyword at a position wins.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class _Matcher:
+    """Compiled snapshot of a registry's patterns."""
+
+    def __init__(self, specs: Iterable[AgentSpec]) -> None:
+        self.keywords: Dict[str, AgentSpec] = {}
+        self.groups: Dict[str, AgentSpec] = {}
+        for spec in sorted(specs, key=lambda s: s.priority):
+            if spec.regex:
+                self.groups[f"a{len(self.groups)}"] = spec
+            else:
+                # A keyword claimed by several agents goes to the highest priority.
+                self.keywords.update((p.lower(), spec) for p in spec.patterns)
+        self.top = max([s.priority for s in self.keywords.values()] + [s.priority for s in self.groups.values()])
+        # A zero-width lookahead reports every start position, so keywords
+        # overlapping an earlier match are still seen.
+        self.literal = (
+            re.compile(f"(?=({_trie_pattern(self.keywords)}))", re.IGNORECASE) if self.keywords else None
+        )
+        # Highest priority first so it wins when several groups match at one position.
+        ordered = sorted(self.groups.items(), key=lambda item: -item[1].priority)
+        self.pattern = (
+            re.compile("|".join(f"(?P<{g}>{'|'.join(s.patterns)})" for g, s in ordered), re.IGNORECASE)
+            if ordered
+            else None
+        )
+
+    def _literal_best(self, text: str) -> Optional[Tuple[AgentSpec, int]]:
+        best: Optional[Tuple[AgentSpec, int]] = None
+        keywords = self.keywords
+        for match in self.literal.finditer(text):
+            found = match.group(1).lower()
+            # The trie prefers the longest keyword; shorter keywords that are
+            # prefixes of it start at the same position too.
+            for end in range(len(found), 0, -1):
+                spec = keywords.get(found[:end])
+                if spec is not None and (best is None or spec.priority > best[0].priority):
+                    best = (spec, match.start())
+                    if spec.priority == self.top:
+                        return best
+        return best
+
+    def _pattern_best(self, text: str) -> Optional[Tuple[AgentSpec, int]]:
+        best: Optional[Tuple[AgentSpec, int]] = None
+        for match in self.pattern.finditer(text):
+            spec = self.groups[match.lastgroup]
+            if best is None or spec.priority > best[0].priority:
+                best = (spec, match.start())
+                if spec.priority == self.top:
+                    break
+        return best
+
+    def route(self, text: str) -> Optional[AgentSpec]:
+        candidates = []
+        if self.literal is not None:
+            candidates.append(self._literal_best(text))
+        if self.pattern is not None:
+            candidates.append(self._pattern_best(text))
+        found = [c for c in candidates if c is not None]
+        if not found:
+            return None
+        return max(found, key=lambda c: (c[0].priority, -c[1]))[0]
+
+
+class AgentRegistry:
+    """Agents and the trigger patterns that route requests to them.
+
+    Patterns are case-insensitive substrings unless registered with
+    ``regex=True``. Keywords compile into one trie-shaped regex (and regex
+    patterns into one alternation), so routing scans the input once however
+    many agents are registered. When several agents match, the highest
+    ``priority`` wins, then the earliest match in the input.
+    """
+
+    def __init__(self) -> None:
+        self._specs: Dict[str, AgentSpec] = {}
+        self._matcher: Optional[_Matcher] = None
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        factory: AgentFactory,
+        patterns: Iterable[str],
+        priority: int = 0,
+        regex: bool = False,
+    ) -> None:
+        with self._lock:
+            self._specs[name] = AgentSpec(name, factory, tuple(patterns), priority, regex)
+            self._matcher = None
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._specs.pop(name, None)
+            self._matcher = None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def spec(self, name: str) -> AgentSpec:
+        return self._specs[name]
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def _compile(self) -> Optional[_Matcher]:
+        with self._lock:
+            if self._matcher is None:
+                specs = [spec for spec in self._specs.values() if spec.patterns]
+                if not specs:
+                    return None
+                self._matcher = _Matcher(specs)
+            return self._matcher
+
+    def route(self, text: str) -> Optional[str]:
+        """Return the name of the agent that should handle ``text``."""
+        matcher = self._compile()
+        spec = matcher.route(text) if matcher is not None else None
+        return spec.name if spec else None
+
+
+class AgentRouter:
+    """Route requests to agents, creating each agent on first use."""
+
+    def __init__(self, context_manager: Any, model_selector: Any, registry: Optional[AgentRegistry] = None) -> None:
+        self.context_manager = context_manager
+        self.model_selector = model_selector
+        self.registry = registry or default_registry
+        self.agents: Dict[str, Agent] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Agent:
+        """Return the agent registered as ``name``, building it if needed."""
+        agent = self.agents.get(name)
+        if agent is None:
+            with self._lock:
+                agent = self.agents.get(name)
+                if agent is None:
+                    factory = _resolve(self.registry.spec(name).factory)
+                    agent = self.agents[name] = factory(self.context_manager, self.model_selector)
+        return agent
+
+    def select(self, text: str) -> Optional[Agent]:
+        """Return the agent for ``text``, or ``None`` if nothing matches."""
+        name = self.registry.route(text)
+        return self.get(name) if name else None
+
+
+default_registry = AgentRegistry()
+default_registry.register(
+    "code",
+    ".code:CodeAgent",
+    ["explain", "analyze", "code", "function", "class", "method"],
+    priority=20,
+)
+default_registry.register(
+    "file",
+    ".file:FileAgent",
+    ["read", "head", "tail", "write", "file", "content", "text"],
+    priority=10,
+)
@@ -9,6 +9,8 @@ from ..services.llm_client import LLMClient
 class SummarizerAgent(Agent):
     """Summarize a block of text using an LLM with a fallback."""
 
+    uses_context = True
+
     def __init__(self, llm_client: Optional[LLMClient] = None) -> None:
         self.llm = llm_client or LLMClient()
 
@@ -19,8 +21,10 @@ class SummarizerAgent(Agent):
         prompt = (
             "Summarize the following text in 200 words or less:\n" + request.content
         )
+        if request.context:
+            prompt = f"{request.context}\n\n{prompt}"
         try:
-            summary = self.llm.generate("medium", prompt)
+            summary = self.llm.generate("auto", prompt, task_type="summarize")
             if not summary:
                 # Fallback to a simple truncation if LLM fails
                 summary = request.content[:200] + "..." if len(request.content) > 200 else request.content
@@ -1,26 +1,237 @@
 from __future__ import annotations
 
-import subprocess
+import asyncio
+import os
+import signal
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Deque, Optional
+
 from .base import Agent, TaskRequest, TaskResponse
+from ..utils.loop import get_runner
+
+READ_SIZE = 64 * 1024
+
+
+@dataclass
+class CommandResult:
+    command: str
+    returncode: Optional[int]
+    output: str
+    timed_out: bool = False
+    truncated_bytes: int = 0
+    duration: float = 0.0
+
+    def render(self) -> str:
+        """Output plus a note when the command timed out or failed."""
+        parts = [self.output] if self.output else []
+        if self.timed_out:
+            parts.append(f"[timed out after {self.duration:.1f}s]")
+        elif self.returncode:
+            parts.append(f"[exit code {self.returncode}]")
+        return "\n".join(parts)
+
+
+class _OutputBuffer:
+    """Keep the head and tail of a command's output within ``max_bytes``."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head: list[str] = []
+        self.head_bytes = 0
+        self.tail: Deque[str] = deque()
+        self.tail_bytes = 0
+        self.dropped = 0
+
+    def add(self, line: str) -> None:
+        size = len(line.encode("utf-8")) + 1
+        if size > self.tail_limit:
+            # Clip oversized lines instead of letting one evict everything else.
+            line = line.encode("utf-8")[: self.tail_limit - 1].decode("utf-8", errors="ignore")
+            clipped = len(line.encode("utf-8")) + 1
+            self.dropped += size - clipped
+            size = clipped
+        if self.head_bytes + size <= self.head_limit:
+            self.head.append(line)
+            self.head_bytes += size
+            return
+        self.tail.append(line)
+        self.tail_bytes += size
+        while self.tail_bytes > self.tail_limit and self.tail:
+            dropped = len(self.tail.popleft().encode("utf-8")) + 1
+            self.tail_bytes -= dropped
+            self.dropped += dropped
+
+    def text(self) -> str:
+        lines = list(self.head)
+        if self.dropped:
+            lines.append(f"[... {self.dropped} bytes truncated ...]")
+        lines.extend(self.tail)
+        return "\n".join(lines)
 
 
 class SystemAgent(Agent):
-    """Agent for executing shell commands in a sandboxed way."""
+    """Agent for executing shell commands in a sandboxed way.
+
+    Commands run as asyncio subprocesses in their own process group, so a
+    timeout kills the whole pipeline rather than just the shell. Output
+    (stdout and stderr interleaved) is read incrementally and handed to the
+    caller line by line; only the first and last ``max_output_bytes / 2``
+    bytes are kept for the final result. At most ``max_concurrency``
+    commands run at once per event loop.
+    """
+
+    def __init__(
+        self,
+        *args,
+        timeout: Optional[float] = 60.0,
+        max_output_bytes: int = 1024 * 1024,
+        max_line_bytes: int = 64 * 1024,
+        max_concurrency: int = 4,
+        kill_grace: float = 2.0,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.max_line_bytes = max_line_bytes
+        self.max_concurrency = max_concurrency
+        self.kill_grace = kill_grace
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
 
     def handle(self, request: TaskRequest) -> TaskResponse:
-        # TODO: Replace subprocess.run with a more secure method for executing shell commands.
-        # This could involve using a dedicated command execution service, a safer subprocess
-        # library, or carefully sanitizing inputs.
-        try:
-            print("SYSTEM CMD:", request.content)
-            result = subprocess.run(
-                request.content,
-                shell=True,
-                check=True,
-                capture_output=True,
-                text=True,
+        # TODO: Replace shell execution with a more secure method for executing shell commands.
+        # This could involve using a dedicated command execution service or carefully
+        # sanitizing inputs.
+        return get_runner().run(self.ahandle(request))
+
+    async def ahandle(self, request: TaskRequest) -> TaskResponse:
+        """Async counterpart of :meth:`handle`."""
+        result = await self.arun(request.content)
+        return TaskResponse(content=result.render())
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop, so keep one per running loop.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return semaphore
+
+    async def arun(
+        self,
+        command: str,
+        on_line: Optional[Callable[[str], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> CommandResult:
+        """Run ``command``, calling ``on_line`` with each output line as it arrives.
+
+        ``timeout`` overrides the agent default; ``None`` uses the default.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        buffer = _OutputBuffer(self.max_output_bytes)
+
+        def emit(raw: bytes) -> None:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
+            buffer.add(line)
+            if on_line is not None:
+                on_line(line)
+
+        async with self._semaphore():
+            started = time.monotonic()
+            proc = await asyncio.create_subprocess_shell(
+                command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                start_new_session=os.name == "posix",
             )
-            output = result.stdout.strip()
-        except subprocess.CalledProcessError as exc:
-            output = exc.stderr.strip()
-        return TaskResponse(content=output)
+            timed_out = False
+            try:
+                # One deadline for output and exit: a command can close its
+                # output and keep running, or leave a child holding the pipe.
+                returncode = await asyncio.wait_for(self._complete(proc, emit), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                returncode = await self._kill(proc)
+            except asyncio.CancelledError:
+                await self._kill(proc)
+                raise
+        return CommandResult(
+            command=command,
+            returncode=returncode,
+            output=buffer.text(),
+            timed_out=timed_out,
+            truncated_bytes=buffer.dropped,
+            duration=time.monotonic() - started,
+        )
+
+    async def astream(self, command: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield output lines of ``command`` as they are produced.
+
+        A final status line is yielded if the command timed out or failed.
+        """
+        lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        run = asyncio.ensure_future(self.arun(command, lines.put_nowait, timeout))
+        run.add_done_callback(lambda _: lines.put_nowait(None))
+        try:
+            while True:
+                line = await lines.get()
+                if line is None:
+                    break
+                yield line
+            result = run.result()
+            if result.timed_out:
+                yield f"[timed out after {result.duration:.1f}s]"
+            elif result.returncode:
+                yield f"[exit code {result.returncode}]"
+        finally:
+            if not run.done():
+                run.cancel()
+
+    async def _complete(self, proc: asyncio.subprocess.Process, emit: Callable[[bytes], None]) -> int:
+        await self._pump(proc, emit)
+        return await proc.wait()
+
+    async def _pump(self, proc: asyncio.subprocess.Process, emit: Callable[[bytes], None]) -> None:
+        assert proc.stdout is not None
+        pending = b""
+        while True:
+            data = await proc.stdout.read(READ_SIZE)
+            if not data:
+                break
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                emit(line)
+            # Split runaway lines so a single line cannot grow without bound.
+            while len(pending) >= self.max_line_bytes:
+                emit(pending[: self.max_line_bytes])
+                pending = pending[self.max_line_bytes :]
+        if pending:
+            emit(pending)
+
+    async def _kill(self, proc: asyncio.subprocess.Process) -> Optional[int]:
+        """Terminate the command's process group, escalating to SIGKILL."""
+        self._signal(proc, signal.SIGTERM)
+        try:
+            return await asyncio.wait_for(proc.wait(), self.kill_grace)
+        except asyncio.TimeoutError:
+            self._signal(proc, signal.SIGKILL if os.name == "posix" else signal.SIGTERM)
+            return await proc.wait()
+
+    @staticmethod
+    def _signal(proc: asyncio.subprocess.Process, sig: int) -> None:
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, sig)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import time
+from dataclasses import asdict
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Optional
 
-from ..orchestrator import MultiContextPlanner
+from ..context_cache import context_cache_from_env
+from ..context_manager import ContextManager
+from ..jobs import JobManager, QueueFullError
+from ..metrics import CONTENT_TYPE, STAGE_SECONDS, metrics
+from ..orchestrator import TaskOrchestrator
 from ..model_selector import ModelSelector
 
 app = FastAPI(title="Jarvis API")
-planner = MultiContextPlanner()
+planner = TaskOrchestrator(ContextManager(cache=context_cache_from_env()))
 selector = ModelSelector()
+jobs = JobManager()
 
 class Task(BaseModel):
     """Represents a task to be executed by the system."""
@@ -40,6 +49,13 @@ class TaskInfo(BaseModel):
     status: str
 
 
+class JobInfo(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+
 class ModelSelectionRequest(BaseModel):
     prompt: str
 
@@ -48,47 +64,107 @@ class ModelSelectionResponse(BaseModel):
     model: str
 
 
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    if not metrics.enabled:
+        return await call_next(request)
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, to keep task ids out of labels.
+    route = request.scope.get("route")
+    metrics.observe(
+        STAGE_SECONDS,
+        time.perf_counter() - started,
+        stage="http",
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/tasks/{task_id}/trace", include_in_schema=False)
+async def get_trace(task_id: str):
+    """Recorded stage spans of a task, oldest first."""
+    return [asdict(span) for span in metrics.trace(task_id)]
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await jobs.shutdown()
+
+
 @app.post("/select-model", response_model=ModelSelectionResponse)
-def select_model(req: ModelSelectionRequest):
+async def select_model(req: ModelSelectionRequest):
     model = selector.select(req.prompt)
     return ModelSelectionResponse(model=model)
 
 
-
-  @app.post("/tasks/create", response_model=CreateTaskResponse)
-def create_task(req: CreateTaskRequest):
-    task_id = planner.create_task(req.prompt)
+@app.post("/tasks/create", response_model=CreateTaskResponse)
+async def create_task(req: CreateTaskRequest):
+    task_id = await planner.acreate_task(req.prompt)
     return CreateTaskResponse(task_id=task_id)
 
 
 @app.get("/tasks", response_model=list[TaskInfo])
-def list_tasks(status: str | None = None):
-    tasks = planner.context_manager.list_tasks(status=status)
+async def list_tasks(status: str | None = None):
+    tasks = await planner.context_manager.list_tasks(status=status)
     return [TaskInfo(id=t.id, prompt=t.prompt, status=t.status) for t in tasks]
 
 
 @app.get("/tasks/{task_id}", response_model=TaskInfo)
-def get_task(task_id: str):
-    t = planner.context_manager.get_task_record(task_id)
+async def get_task(task_id: str):
+    t = await planner.context_manager.get_task(task_id)
     if t is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return TaskInfo(id=t.id, prompt=t.prompt, status=t.status)
 
 
-@app.post("/tasks/{task_id}", response_model=TaskOutput)
-def handle_task(task_id: str, input: TaskInput):
+def _job_info(job) -> JobInfo:
+    return JobInfo(job_id=job.id, status=job.status, result=job.result, error=job.error)
+
+
+async def _run_task(task_id: str, content: str, background: bool):
+    """Handle a task inline, or as a background job answered with 202."""
+    if background:
+        try:
+            # Raised errors mark the job failed instead of completing it
+            # with an "Error: ..." result.
+            job = jobs.submit(lambda: planner.ahandle(task_id, content, raise_errors=True))
+        except QueueFullError as exc:
+            raise HTTPException(status_code=429, detail=str(exc))
+        return JSONResponse(
+            status_code=202,
+            content=_job_info(job).model_dump(),
+            headers={"Location": f"/jobs/{job.id}"},
+        )
     try:
-        output = planner.handle(task_id, input.content)
+        output = await planner.ahandle(task_id, content)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
     return TaskOutput(content=output)
 
 
-@app.post("/tasks/{task_id}/update", response_model=TaskOutput)
-def update_task(task_id: str, input: TaskInput):
+@app.post("/tasks/{task_id}", response_model=TaskOutput, responses={202: {"model": JobInfo}})
+async def handle_task(task_id: str, input: TaskInput, background: bool = False):
+    """Process input for a task; with ``background=true`` return a job to poll."""
+    return await _run_task(task_id, input.content, background)
+
+
+@app.post("/tasks/{task_id}/update", response_model=TaskOutput, responses={202: {"model": JobInfo}})
+async def update_task(task_id: str, input: TaskInput, background: bool = False):
     """Append new input to an existing task and process it."""
-    try:
-        output = planner.handle(task_id, input.content)
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail=str(exc))
-    return TaskOutput(content=output)
+    return await _run_task(task_id, input.content, background)
+
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_info(job)
@@ -1,18 +1,57 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+import os
 import sys
-import asyncio
 
 import click
 from rich.console import Console
-from rich.markdown import Markdown
-from .context_manager import ContextManager
-from .workflow_manager import WorkflowManager
+
+# Heavy modules (SQLAlchemy, agents, model clients) are imported on first
+# use so that quick commands and ``--help`` start fast.
+if TYPE_CHECKING:
+    from .context_manager import ContextManager
+    from .workflow_manager import WorkflowManager
 
 
 console = Console()
 
+DEFAULT_API_URL = "http://localhost:8000"
+
+
+class Services:
+    """Builds the context and workflow managers the first time they are used."""
+
+    def __init__(self) -> None:
+        self._context_manager: Optional[ContextManager] = None
+        self._workflow_manager: Optional[WorkflowManager] = None
+
+    @property
+    def context_manager(self) -> ContextManager:
+        if self._context_manager is None:
+            from .context_cache import context_cache_from_env
+            from .context_manager import ContextManager
+
+            self._context_manager = ContextManager(cache=context_cache_from_env())
+        return self._context_manager
+
+    @property
+    def workflow_manager(self) -> WorkflowManager:
+        if self._workflow_manager is None:
+            from .response_cache import ResponseCache
+            from .workflow_manager import WorkflowManager
+
+            self._workflow_manager = WorkflowManager(
+                self.context_manager, response_cache=ResponseCache("jarvis_cache.db")
+            )
+        return self._workflow_manager
+
+
+def print_markdown(text: str) -> None:
+    from rich.markdown import Markdown
+
+    console.print(Markdown(text))
+
 
 @click.group()
 def cli() -> None:
@@ -25,63 +64,143 @@ def cli() -> None:
 @click.option("--task-id", help="Continue an existing task")
 def main(command: tuple[str, ...], task_id: Optional[str]) -> None:
     """Run a command or start an interactive session."""
-    context_manager = ContextManager()
-    workflow_manager = WorkflowManager(context_manager)
+    services = Services()
 
     if command:
         # Join the command parts and handle special cases
         full_command = " ".join(command)
-        run_command(full_command, task_id, workflow_manager)
+        run_command(full_command, task_id, services)
     else:
-        run_interactive(workflow_manager)
+        run_interactive(services)
 
 
-def run_command(command: str, task_id: Optional[str], workflow_manager: WorkflowManager) -> None:
+@cli.command()
+@click.argument("task_id", required=False)
+@click.option(
+    "--url",
+    envvar="JARVIS_API_URL",
+    default=DEFAULT_API_URL,
+    show_default=True,
+    help="Base URL of the running Jarvis API to read metrics from.",
+)
+def stats(task_id: Optional[str], url: str) -> None:
+    """Show a running API's stage latencies and counters, or a task's spans.
+
+    Metrics are kept in memory by the process that records them, so this
+    reads them from the API's /metrics endpoint. Inside an interactive
+    session, ``stats`` shows that session's own metrics.
+    """
+    print_stats(task_id, url=url)
+
+
+def print_tasks(services: Services) -> None:
+    """Print every task with its status and prompt."""
+    from .utils.loop import get_runner
+
+    tasks = get_runner().run(services.context_manager.list_tasks())
+    if not tasks:
+        console.print("No tasks found")
+        return
+
+    for task in tasks:
+        console.print(f"Task {task.id}: {task.status}")
+        if task.prompt:
+            console.print(f"Prompt: {task.prompt}")
+        console.print("")
+
+
+def fetch_stats(url: str, task_id: Optional[str] = None):
+    """Metrics snapshot, or the spans of ``task_id``, from the API at ``url``."""
+    import json
+    from urllib.request import urlopen
+
+    from .metrics import Span, parse_snapshot
+
+    base = url.rstrip("/")
+    if task_id:
+        with urlopen(f"{base}/tasks/{task_id}/trace", timeout=10) as response:
+            return [Span(**span) for span in json.load(response)]
+    with urlopen(f"{base}/metrics", timeout=10) as response:
+        return parse_snapshot(response.read().decode("utf-8"))
+
+
+def print_stats(task_id: Optional[str] = None, url: Optional[str] = None) -> None:
+    """Print stage latencies and counters, or the spans of one task.
+
+    Metrics live in the process that records them: without ``url`` this
+    prints the current process's own, with it those of a running API.
+    """
+    from rich.table import Table
+
+    from .metrics import metrics
+
+    if url:
+        try:
+            remote = fetch_stats(url, task_id)
+        except OSError as exc:
+            console.print(f"[red]Could not read metrics from {url}: {exc}[/red]")
+            return
+    if task_id:
+        spans = remote if url else metrics.trace(task_id)
+        if not spans:
+            console.print(f"No spans recorded for task {task_id}")
+            return
+        table = Table("Stage", "Duration (ms)", "Labels", "Error")
+        for span in spans:
+            labels = ", ".join(f"{k}={v}" for k, v in span.labels.items())
+            table.add_row(span.name, f"{span.duration * 1000:.1f}", labels, span.error or "")
+        console.print(table)
+        return
+
+    snapshot = remote if url else metrics.snapshot()
+    if not snapshot["stages"] and not snapshot["counters"]:
+        console.print("No metrics recorded yet")
+        return
+    table = Table("Stage", "Count", "Mean (ms)", "p50 (ms)", "p95 (ms)")
+    for stage, summary in sorted(snapshot["stages"].items()):
+        table.add_row(
+            stage,
+            str(summary["count"]),
+            f"{summary['mean'] * 1000:.1f}",
+            f"<={summary['p50'] * 1000:g}",
+            f"<={summary['p95'] * 1000:g}",
+        )
+    console.print(table)
+    counters = Table("Counter", "Value")
+    for name, value in sorted(snapshot["counters"].items()):
+        counters.add_row(name, f"{value:g}")
+    console.print(counters)
+
+
+def run_command(command: str, task_id: Optional[str], services: Services) -> None:
     """Run a single command."""
     try:
         # Handle special commands
         if command == "list":
-            tasks = asyncio.run(workflow_manager.context_manager.list_tasks())
-            if not tasks:
-                console.print("No tasks found")
-                return
-
-            for task in tasks:
-                console.print(f"Task {task.id}: {task.status}")
-                if task.prompt:
-                    console.print(f"Prompt: {task.prompt}")
-                console.print("")
+            print_tasks(services)
+            return
+
+        if command == "stats" or command.startswith("stats "):
+            # A one-shot process has recorded nothing; ask the API instead.
+            parts = command.split()
+            print_stats(parts[1] if len(parts) > 1 else None, url=os.environ.get("JARVIS_API_URL", DEFAULT_API_URL))
             return
 
         if command.startswith("summarize "):
             task_id = command.split()[1]
-            task = asyncio.run(workflow_manager.context_manager.get(task_id))
-            if not task:
-                console.print("Error: Task not found")
-                return
-
-            chunks = asyncio.run(workflow_manager.context_manager.get_chunks(task_id))
-            if not chunks:
-                console.print("No content found for this task")
-                return
-
-            content = "\n".join(chunk.content for chunk in chunks)
-            summary = workflow_manager.model_selector.generate_response(
-                f"Summarize the following task history:\n\n{content}",
-                system_prompt="You are a helpful assistant that summarizes task histories."
-            )
-            console.print(Markdown(summary))
+            summary = services.workflow_manager.summarize_task(task_id)
+            print_markdown(summary)
             return
 
         # Execute workflow
-        output = workflow_manager.execute_workflow(command)
-        console.print(Markdown(output))
+        output = services.workflow_manager.execute_workflow(command)
+        print_markdown(output)
 
     except Exception as e:
         console.print(f"[red]Error: {str(e)}[/red]")
 
 
-def run_interactive(workflow_manager: WorkflowManager) -> None:
+def run_interactive(services: Services) -> None:
     """Run an interactive session."""
     console.print("[bold blue]Welcome to Jarvis CLI![/bold blue]")
     console.print("\nYou can ask me to:")
@@ -91,6 +210,7 @@ def run_interactive(workflow_manager: WorkflowManager) -> None:
     console.print("\nSpecial commands:")
     console.print("  list - List all tasks")
     console.print("  summarize <task-id> - Get a summary of a task")
+    console.print("  stats [task-id] - Show timing metrics, or the spans of a task")
     console.print("\nType 'exit' to quit\n")
 
     while True:
@@ -100,41 +220,23 @@ def run_interactive(workflow_manager: WorkflowManager) -> None:
                 break
 
             if command == "list":
-                tasks = asyncio.run(workflow_manager.context_manager.list_tasks())
-                if not tasks:
-                    console.print("No tasks found")
-                    continue
-
-                for task in tasks:
-                    console.print(f"Task {task.id}: {task.status}")
-                    if task.prompt:
-                        console.print(f"Prompt: {task.prompt}")
-                    console.print("")
+                print_tasks(services)
+                continue
+
+            if command == "stats" or command.startswith("stats "):
+                parts = command.split()
+                print_stats(parts[1] if len(parts) > 1 else None)
                 continue
 
             if command.startswith("summarize "):
                 task_id = command.split()[1]
-                task = asyncio.run(workflow_manager.context_manager.get(task_id))
-                if not task:
-                    console.print("Error: Task not found")
-                    continue
-
-                chunks = asyncio.run(workflow_manager.context_manager.get_chunks(task_id))
-                if not chunks:
-                    console.print("No content found for this task")
-                    continue
-
-                content = "\n".join(chunk.content for chunk in chunks)
-                summary = workflow_manager.model_selector.generate_response(
-                    f"Summarize the following task history:\n\n{content}",
-                    system_prompt="You are a helpful assistant that summarizes task histories."
-                )
-                console.print(Markdown(summary))
+                summary = services.workflow_manager.summarize_task(task_id)
+                print_markdown(summary)
                 continue
 
             # Execute workflow
-            output = workflow_manager.execute_workflow(command)
-            console.print(Markdown(output))
+            output = services.workflow_manager.execute_workflow(command)
+            print_markdown(output)
 
         except click.Abort:
             break
@@ -144,8 +246,8 @@ def run_interactive(workflow_manager: WorkflowManager) -> None:
 
 if __name__ == "__main__":
     # Handle command line arguments with spaces
-    if len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
-        # If the first argument doesn't start with "-", it's a command
-        # Join all arguments after the first one
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("-") and sys.argv[1] not in cli.commands:
+        # If the first argument is neither an option nor a subcommand, it's
+        # a command: join all the arguments into one
         sys.argv = [sys.argv[0], "main", " ".join(sys.argv[1:])]
     cli()
@@ -0,0 +1,113 @@
+"""Token-budgeted prompt context assembly."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from .context_manager import ContextManager
+from .ingestion import chunk_doc_id
+from .utils.chunker import count_tokens
+from .vector_store import VectorStore
+
+
+@dataclass
+class PromptContext:
+    """Context for one task, sized to fit a prompt."""
+
+    task_id: str
+    summary: Optional[str] = None
+    related: List[str] = field(default_factory=list)
+    recent: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+    def render(self) -> str:
+        sections = []
+        if self.summary:
+            sections.append(f"Summary of earlier work:\n{self.summary}")
+        if self.related:
+            sections.append("Related history:\n" + "\n---\n".join(self.related))
+        if self.recent:
+            sections.append("Recent history:\n" + "\n---\n".join(self.recent))
+        return "\n\n".join(sections)
+
+
+def _truncate(text: str, budget: int, measure: Callable[[str], int]) -> str:
+    """Keep the head of ``text`` that fits in ``budget``."""
+    if measure(text) <= budget:
+        return text
+    words = text.split()
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if measure(" ".join(words[:mid])) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low])
+
+
+class ContextBuilder:
+    """Assemble a task's context under a token budget.
+
+    The budget is split between the rolling summary (``summary_share``),
+    chunks similar to the current query found through ``vector_store``
+    (``related_share``) and the most recent chunks, which get the rest plus
+    anything the other parts did not use. Recent chunks are streamed from
+    SQLite newest-first and reading stops once the budget is spent, so the
+    cost per request does not grow with the age of the task.
+    """
+
+    def __init__(
+        self,
+        context_manager: ContextManager,
+        vector_store: Optional[VectorStore] = None,
+        token_budget: int = 2000,
+        summary_share: float = 0.25,
+        related_share: float = 0.25,
+        related_limit: int = 5,
+        measure: Callable[[str], int] = count_tokens,
+    ) -> None:
+        self.context_manager = context_manager
+        self.vector_store = vector_store
+        self.token_budget = token_budget
+        self.summary_share = summary_share
+        self.related_share = related_share
+        self.related_limit = related_limit
+        self.measure = measure
+
+    def _related(self, task_id: str, query: str) -> List[Tuple[str, str]]:
+        """Ids and texts of the task's documents closest to ``query``; blocking."""
+        matches = self.vector_store.search(query, self.related_limit, {"task_id": task_id})
+        return [(doc_id, self.vector_store.get_document(doc_id)) for doc_id, _, _ in matches]
+
+    async def build(self, task_id: str, query: Optional[str] = None) -> PromptContext:
+        context = PromptContext(task_id=task_id)
+        remaining = self.token_budget
+
+        latest = await self.context_manager.get_latest_summary(task_id)
+        if latest and latest.content:
+            context.summary = _truncate(
+                latest.content, int(self.token_budget * self.summary_share), self.measure
+            )
+            remaining -= self.measure(context.summary)
+
+        related_ids: List[str] = []
+        if self.vector_store is not None and query:
+            related_budget = int(self.token_budget * self.related_share)
+            matches = await asyncio.to_thread(self._related, task_id, query)
+            for doc_id, text in matches:
+                cost = self.measure(text)
+                if cost > related_budget:
+                    continue
+                context.related.append(text)
+                related_ids.append(doc_id)
+                related_budget -= cost
+                remaining -= cost
+
+        recent = await self.context_manager.get_recent_chunks(task_id, max(remaining, 0), self.measure)
+        seen = set(related_ids)
+        context.recent = [content for chunk_id, content in recent if chunk_doc_id(chunk_id) not in seen]
+        context.tokens = self.token_budget - remaining + sum(self.measure(c) for c in context.recent)
+        return context
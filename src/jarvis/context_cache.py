@@ -0,0 +1,277 @@
+"""Read-through cache for task context in front of ``ContextManager``.
+
+Cached values are grouped under a tag, such as ``chunks:<task id>``, so a
+write can drop everything derived from the data it changed in one call. Each tag also has a
+generation number. A read records the generation before it queries the
+database and its result is only served while the generation is
+unchanged, so a slow read cannot cache data older than a concurrent
+write. The in-process cache keeps generations in memory; the Redis cache
+keeps them on the server so they cover every process sharing it.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+def approximate_size(value: Any) -> int:
+    """Rough memory footprint in bytes of a cached value.
+
+    Counts strings, containers and the attributes of plain and mapped
+    objects; SQLAlchemy instance state is ignored.
+    """
+    if isinstance(value, (str, bytes)):
+        return 49 + len(value)
+    if isinstance(value, (list, tuple, set)):
+        return 56 + 8 * len(value) + sum(approximate_size(item) for item in value)
+    if isinstance(value, dict):
+        return 64 + sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    attrs = getattr(value, "__dict__", None)
+    if attrs is not None:
+        return 64 + sum(approximate_size(v) for k, v in attrs.items() if not k.startswith("_sa_"))
+    return 32
+
+
+class ContextCache(ABC):
+    """Interface of context cache backends.
+
+    ``blocking`` tells callers whether operations do I/O and should run off
+    the event loop.
+    """
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self._generations: Dict[str, int] = {}
+        self._generation_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, tag: str) -> int:
+        return self._generations.get(tag, 0)
+
+    def _bump(self, tag: str) -> None:
+        with self._generation_lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def get(self, key: str, tag: str) -> Optional[Tuple[Any]]:
+        """Return ``(value,)`` for ``key`` cached under ``tag``, or ``None`` on a miss."""
+        hit = self._get(key, tag)
+        if hit is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return hit
+
+    def set(self, key: str, value: Any, tag: str, generation: Optional[int] = None) -> None:
+        """Cache ``value`` under ``key``, unless ``tag`` changed since ``generation``."""
+        if generation is not None and generation != self.generation(tag):
+            return
+        self._set(key, value, tag)
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every key cached under ``tags``."""
+        for tag in tags:
+            self._bump(tag)
+        self._invalidate(tags)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    @abstractmethod
+    def _get(self, key: str, tag: str) -> Optional[Tuple[Any]]:
+        ...
+
+    @abstractmethod
+    def _set(self, key: str, value: Any, tag: str) -> None:
+        ...
+
+    @abstractmethod
+    def _invalidate(self, tags: Tuple[str, ...]) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class LRUContextCache(ContextCache):
+    """In-process LRU capped at ``max_bytes``, as measured by :func:`approximate_size`.
+
+    Values are kept as is rather than copied, so callers must treat what
+    they read as read-only. Values larger than ``max_entry_bytes`` are not
+    cached. Only writes made through this process invalidate entries, so
+    use a shared backend when several processes write to the same database.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entry_bytes: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, str, int, float]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, tag: str) -> Optional[Tuple[Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.monotonic() - entry[3] > self.ttl:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return (entry[0],)
+
+    def _set(self, key: str, value: Any, tag: str) -> None:
+        size = approximate_size(value) + len(key)
+        if size > self.max_entry_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, tag, size, time.monotonic())
+            self._tags.setdefault(tag, set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        _, tag, size, _ = self._entries.pop(key)
+        self._bytes -= size
+        keys = self._tags.get(tag)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def _invalidate(self, tags: Tuple[str, ...]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats.update(entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+        return stats
+
+
+class RedisContextCache(ContextCache):
+    """Cache on any server speaking the Redis protocol.
+
+    Values are pickled, so every read returns a fresh copy. Keys live
+    under ``prefix``. Each tag's generation is a counter on the server:
+    invalidating is a single atomic ``INCR`` and every value is stored with
+    the generation its read started under, so a value written by any
+    process after a concurrent invalidation is never served. A read fetches
+    the value and its tag's generation with one ``MGET``. Superseded values
+    are not deleted; they expire after ``ttl`` seconds or are evicted by the
+    server's ``maxmemory`` policy. Values over ``max_entry_bytes`` are not
+    cached. Pass ``client`` to use an existing client, such as one for a
+    local stand-in server.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "jarvis:ctx:",
+        ttl: Optional[float] = 3600.0,
+        max_entry_bytes: int = 8 * 1024 * 1024,
+        client: Any = None,
+    ) -> None:
+        super().__init__()
+        if client is None:
+            import redis  # deferred: only needed for this backend
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+
+    def _generation_key(self, tag: str) -> str:
+        return f"{self.prefix}gen:{tag}"
+
+    def generation(self, tag: str) -> int:
+        # A missing counter starts at a random value rather than 0, so a
+        # counter evicted by the server cannot come back at a generation
+        # that old values were stored under.
+        pipe = self.client.pipeline(transaction=False)
+        pipe.set(self._generation_key(tag), random.getrandbits(62), nx=True)
+        pipe.get(self._generation_key(tag))
+        return int(pipe.execute()[1])
+
+    def set(self, key: str, value: Any, tag: str, generation: Optional[int] = None) -> None:
+        """Cache ``value`` under ``key``; it is served only while ``tag`` is at ``generation``."""
+        if generation is None:
+            generation = self.generation(tag)
+        self._set(key, (generation, value), tag)
+
+    def _get(self, key: str, tag: str) -> Optional[Tuple[Any]]:
+        payload, generation = self.client.mget([self.prefix + key, self._generation_key(tag)])
+        if payload is None or generation is None:
+            return None
+        stored, value = pickle.loads(payload)
+        return (value,) if stored == int(generation) else None
+
+    def _set(self, key: str, value: Any, tag: str) -> None:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_entry_bytes:
+            return
+        self.client.set(self.prefix + key, payload, ex=int(self.ttl) if self.ttl else None)
+
+    def _invalidate(self, tags: Tuple[str, ...]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(self._generation_key(tag))
+        pipe.execute()
+
+    def clear(self) -> None:
+        # Counters go too: recreated ones start at a new random generation.
+        keys = list(self.client.scan_iter(match=self.prefix + "*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def context_cache_from_env() -> Optional[ContextCache]:
+    """Build the cache selected by ``JARVIS_CONTEXT_CACHE``, if any.
+
+    ``memory`` gives an :class:`LRUContextCache` of
+    ``JARVIS_CONTEXT_CACHE_BYTES`` bytes, ``redis`` a
+    :class:`RedisContextCache` on ``JARVIS_CONTEXT_CACHE_URL``. Unset or
+    ``off`` disables caching.
+    """
+    backend = os.environ.get("JARVIS_CONTEXT_CACHE", "off").lower()
+    if backend in ("", "0", "off", "none", "false"):
+        return None
+    if backend == "memory":
+        return LRUContextCache(max_bytes=int(os.environ.get("JARVIS_CONTEXT_CACHE_BYTES", 64 * 1024 * 1024)))
+    if backend == "redis":
+        return RedisContextCache(url=os.environ.get("JARVIS_CONTEXT_CACHE_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown context cache backend: {backend}")
@@ -1,124 +1,655 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+import logging
+import threading
+import time
+import types
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, List, Optional, Set, Tuple, TypeVar, Union
+from dataclasses import dataclass, field
 from datetime import datetime
 
-from sqlmodel import Field, Session, SQLModel, create_engine, select
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
 
-from .db import Base, Task, Chunk, Summary, get_engine, get_sessionmaker
+from .context_cache import ContextCache
+from .metrics import CACHE_REQUESTS, metrics
+from .db import (
+    Task,
+    Chunk,
+    Summary,
+    IngestionProgress,
+    StorageProfile,
+    get_engine,
+    get_profile,
+    get_sessionmaker,
+    is_memory_url,
+    migrate,
+    store_blobs,
+)
 
+T = TypeVar("T")
 
-class Context(SQLModel):
+logger = logging.getLogger(__name__)
+
+# (chunk id, task id, content) of a committed chunk, as passed to listeners.
+ChunkRecord = Tuple[int, str, str]
+
+
+def _measure_key(measure: Callable[[str], int]) -> Optional[str]:
+    """A stable name for a module-level ``measure`` function, else ``None``.
+
+    Lambdas, closures and bound methods may count differently per instance,
+    so results computed with them are not cached.
+    """
+    if isinstance(measure, types.BuiltinFunctionType):
+        owner = getattr(measure, "__self__", None)
+        if owner is not None and not isinstance(owner, types.ModuleType):
+            return None
+    elif not isinstance(measure, types.FunctionType):
+        return None
+    qualname = getattr(measure, "__qualname__", "")
+    if "<" in qualname:
+        return None
+    return f"{measure.__module__}.{qualname}"
+
+
+@dataclass
+class Context:
     """In-memory context for a task."""
     task_id: str
-    history: List[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    history: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class UnitOfWork:
+    """A batch of writes applied in a single session and a single commit.
+
+    Operations are buffered in order and only touch the database when the
+    unit is committed through :meth:`ContextManager.commit` or
+    :meth:`ContextManager.transaction`.
+    """
+
+    def __init__(self) -> None:
+        self.ops: List[Tuple[str, tuple]] = []
+
+    def create_task(self, task_id: str, prompt: str) -> None:
+        self.ops.append(("create_task", (task_id, prompt)))
+
+    def add_chunk(self, task_id: str, content: str) -> None:
+        self.ops.append(("add_chunk", (task_id, content)))
+
+    def add_summary(self, task_id: str, content: str, last_chunk_id: int | None = None) -> None:
+        self.ops.append(("add_summary", (task_id, content, last_chunk_id)))
+
+    def update_status(self, task_id: str, status: str) -> None:
+        self.ops.append(("update_status", (task_id, status)))
 
 
 class ContextManager:
-    """Simplified context manager using only SQLite."""
+    """Simplified context manager using only SQLite.
+
+    SQLAlchemy sessions are blocking, so every database operation is queued
+    onto a dedicated DB thread. The ``async`` methods await that work instead
+    of running it inline, which keeps the caller's event loop responsive.
+    When the storage profile allows it, reads run on a separate pool of
+    threads so they are not queued behind writes.
 
-    def __init__(self, db_url: str = "sqlite:///jarvis.db") -> None:
+    Chunk bodies are stored once per distinct content in the ``blobs``
+    table and compressed when large (see :func:`.db.store_blobs`); chunk
+    reads decode them transparently.
+
+    With a ``cache`` (see :mod:`.context_cache`), task records, histories,
+    chunks and summaries are read through it. Once a write commits it
+    drops only the cached reads it affects: chunk writes those derived
+    from chunks, summary writes the latest summary, and status and lease
+    writes the task record (a status update replaces it in place). Only
+    writes made through this instance invalidate the cache, so an
+    in-process cache must not be combined with other writers to the same
+    database; share a Redis-protocol cache between them instead.
+    """
+
+    def __init__(
+        self,
+        db_url: str = "sqlite:///jarvis.db",
+        group_commit: bool = False,
+        profile: Union[str, StorageProfile] = "production",
+        cache: Optional[ContextCache] = None,
+    ) -> None:
         # Initialize SQLModel
-        self.engine = get_engine(db_url)
-        Base.metadata.create_all(self.engine)
+        self.db_url = db_url
+        self.profile = get_profile(profile)
+        self.engine = get_engine(db_url, self.profile)
         self.SessionLocal = get_sessionmaker(self.engine)
+        # A single writer serialises access to SQLite and keeps per-thread
+        # pools (e.g. in-memory databases) bound to one connection.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-db")
+        if self.profile.read_workers and not is_memory_url(db_url):
+            self._read_executor = ThreadPoolExecutor(
+                max_workers=self.profile.read_workers, thread_name_prefix="jarvis-db-read"
+            )
+        else:
+            self._read_executor = self._executor
+        self._call(migrate, self.engine)
+        # With group commit, units of work committed while the DB thread is
+        # busy are coalesced into the next transaction (one fsync for many).
+        self.group_commit = group_commit
+        self._pending: List[Tuple[UnitOfWork, Future]] = []
+        self._pending_lock = threading.Lock()
+        self._chunk_listeners: List[Callable[[List[ChunkRecord]], None]] = []
+        self.cache = cache
+
+    def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn`` on the DB thread and wait for the result."""
+        return self._executor.submit(fn, *args).result()
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn`` on the DB thread without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        with metrics.timer("db", op=fn.__name__.lstrip("_")):
+            return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def _read(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a read-only ``fn`` on a reader thread."""
+        loop = asyncio.get_running_loop()
+        with metrics.timer("db", op=fn.__name__.lstrip("_")):
+            return await loop.run_in_executor(self._read_executor, fn, *args)
+
+    async def _cache_call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a cache operation, off the event loop if the backend blocks."""
+        if not self.cache.blocking:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, fn, *args)
+
+    def _cache_get(self, key: str, tag: str) -> Optional[Tuple[Any]]:
+        hit = self.cache.get(key, tag)
+        metrics.inc(CACHE_REQUESTS, cache="context", result="hit" if hit is not None else "miss")
+        return hit
+
+    async def _cached_read(self, key: str, tag: str, fn: Callable[..., T], *args: Any) -> T:
+        """Serve ``fn(*args)`` from the cache, reading through on a miss.
 
-    def _ensure_task(self, session: Session, task_id: str, prompt: str | None = None) -> None:
-        if not session.get(Task, task_id):
-            session.add(Task(id=task_id, prompt=prompt or "", status="pending"))
+        ``tag`` names the family of writes that invalidate the result:
+        ``task:<id>`` (task row), ``chunks:<id>`` or ``summary:<id>``.
+        """
+        if self.cache is None:
+            return await self._read(fn, *args)
+        hit = await self._cache_call(self._cache_get, key, tag)
+        if hit is not None:
+            return hit[0]
+        # Taken before the read: a write committed meanwhile bumps it and
+        # the possibly stale result is then not stored.
+        generation = await self._cache_call(self.cache.generation, tag)
+        value = await self._read(fn, *args)
+        await self._cache_call(self.cache.set, key, value, tag, generation)
+        return value
+
+    def _invalidate(self, *tags: str) -> None:
+        """Drop cached reads tagged ``tags``; call after their writes commit."""
+        if self.cache is not None and tags:
+            self.cache.invalidate(*tags)
+
+    def _rewrite_task(self, task: Task) -> None:
+        """Replace the cached record of a committed, detached ``task``."""
+        if self.cache is not None:
+            tag = f"task:{task.id}"
+            # The bump stops reads that started before the write from
+            # storing the old row over this one.
+            self.cache.invalidate(tag)
+            self.cache.set(tag, task, tag)
+
+    def close(self) -> None:
+        """Stop the DB threads and release pooled connections."""
+        if self._read_executor is not self._executor:
+            self._read_executor.shutdown(wait=True)
+        self._call(self.engine.dispose)
+        self._executor.shutdown(wait=True)
+        if self.cache is not None:
+            self.cache.close()
+
+    def add_chunk_listener(self, listener: Callable[[List[ChunkRecord]], None]) -> None:
+        """Call ``listener`` on the DB thread with every batch of committed chunks.
+
+        Listeners must not block; they run between database operations.
+        """
+        self._chunk_listeners.append(listener)
+
+    def remove_chunk_listener(self, listener: Callable[[List[ChunkRecord]], None]) -> None:
+        self._chunk_listeners.remove(listener)
+
+    def _commit(self, session: Session, chunks: List[Chunk]) -> List[ChunkRecord]:
+        """Commit ``session`` and return the records of ``chunks`` for listeners.
+
+        Callers collect the chunks as they add them: ``session.new`` misses
+        any that an earlier flush (e.g. in :meth:`_ensure_task`) wrote out.
+        """
+        if not chunks or not self._chunk_listeners:
             session.commit()
+            return []
+        session.flush()
+        records = [(c.id, c.task_id, c.content) for c in chunks]
+        session.commit()
+        return records
+
+    def _notify(self, records: List[ChunkRecord]) -> None:
+        """Hand committed ``records`` to the chunk listeners.
+
+        Runs after the commit and cache invalidation; a failing listener is
+        logged rather than raised, since the write itself succeeded.
+        """
+        if not records:
+            return
+        for listener in list(self._chunk_listeners):
+            try:
+                listener(records)
+            except Exception:
+                logger.exception("Chunk listener %r failed", listener)
+
+    def _ensure_task(self, session: Session, task_id: str, prompt: str | None = None) -> bool:
+        """Create the task if it does not exist; returns whether it did."""
+        # Flush rather than commit so the caller's commit covers the new row.
+        if session.get(Task, task_id):
+            return False
+        session.add(Task(id=task_id, prompt=prompt or "", status="pending"))
+        session.flush()
+        return True
+
+    def _apply(self, session: Session, uow: UnitOfWork, tags: Set[str]) -> List[Chunk]:
+        """Replay the buffered operations of ``uow`` inside ``session``.
+
+        Returns the chunks it added and adds the cache tags it touched to
+        ``tags``.
+        """
+        chunks: List[Chunk] = []
+        blob_ids = iter(store_blobs(session, [args[1] for name, args in uow.ops if name == "add_chunk"]))
+        for name, args in uow.ops:
+            task_id = args[0]
+            if name == "create_task":
+                if self._ensure_task(session, task_id, args[1]):
+                    tags.add(f"task:{task_id}")
+            elif name == "add_chunk":
+                if self._ensure_task(session, task_id):
+                    tags.add(f"task:{task_id}")
+                # ``content`` is only kept in memory for chunk listeners.
+                chunk = Chunk(task_id=task_id, blob_id=next(blob_ids), content=args[1])
+                session.add(chunk)
+                chunks.append(chunk)
+                tags.add(f"chunks:{task_id}")
+            elif name == "add_summary":
+                if self._ensure_task(session, task_id):
+                    tags.add(f"task:{task_id}")
+                session.add(Summary(task_id=task_id, content=args[1], last_chunk_id=args[2]))
+                tags.add(f"summary:{task_id}")
+            elif name == "update_status":
+                task = session.get(Task, task_id)
+                if task:
+                    task.status = args[1]
+                    tags.add(f"task:{task_id}")
+        return chunks
+
+    def _commit_units(self, units: List[UnitOfWork]) -> None:
+        with self.SessionLocal() as session:
+            chunks: List[Chunk] = []
+            tags: Set[str] = set()
+            for uow in units:
+                chunks.extend(self._apply(session, uow, tags))
+            records = self._commit(session, chunks)
+        self._invalidate(*tags)
+        self._notify(records)
+
+    def _flush_pending(self) -> None:
+        """Commit every queued unit of work in one transaction."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            self._commit_units([uow for uow, _ in batch])
+        except Exception:
+            # Fall back to one transaction per unit so a bad unit only
+            # fails its own caller.
+            for uow, future in batch:
+                try:
+                    self._commit_units([uow])
+                except Exception as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(None)
+            return
+        for _, future in batch:
+            future.set_result(None)
+
+    def _enqueue(self, uow: UnitOfWork) -> Future:
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending.append((uow, future))
+            schedule = len(self._pending) == 1
+        if schedule:
+            self._executor.submit(self._flush_pending)
+        return future
+
+    async def commit(self, uow: UnitOfWork) -> None:
+        """Apply ``uow`` in a single session with a single commit."""
+        if not uow.ops:
+            return
+        if self.group_commit:
+            await asyncio.wrap_future(self._enqueue(uow))
+        else:
+            await self._submit(self._commit_units, [uow])
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[UnitOfWork]:
+        """Collect writes and commit them together when the block exits.
+
+        Nothing is written if the block raises.
+        """
+        uow = UnitOfWork()
+        yield uow
+        await self.commit(uow)
+
+    def _create_task(self, task_id: str, prompt: str) -> None:
+        with self.SessionLocal() as session:
+            created = self._ensure_task(session, task_id, prompt)
+            session.commit()
+        if created:
+            self._invalidate(f"task:{task_id}")
+
+    def _update_status(self, task_id: str, status: str) -> None:
+        with self.SessionLocal() as session:
+            task = session.get(Task, task_id)
+            if not task:
+                return
+            task.status = status
+            # Detach the updated row before commit expires it, so it can
+            # replace the cached record instead of forcing a re-read.
+            session.flush()
+            session.expunge(task)
+            session.commit()
+        self._rewrite_task(task)
+
+    def _get(self, task_id: str) -> Context:
+        with self.SessionLocal() as session:
+            task = session.get(Task, task_id)
+            if not task:
+                raise ValueError(f"Task with ID {task_id} not found")
+
+            # Load history from chunks
+            history = session.execute(
+                select(Chunk.content)
+                .where(Chunk.task_id == task_id)
+                .order_by(Chunk.id)
+            ).scalars().all()
+            return Context(task_id=task_id, history=list(history))
+
+    def _add_chunk(self, task_id: str, content: str) -> None:
+        with self.SessionLocal() as session:
+            created = self._ensure_task(session, task_id)
+            [blob_id] = store_blobs(session, [content])
+            chunk = Chunk(task_id=task_id, blob_id=blob_id, content=content)
+            session.add(chunk)
+            records = self._commit(session, [chunk])
+        self._invalidate(f"chunks:{task_id}", *([f"task:{task_id}"] if created else []))
+        self._notify(records)
+
+    def _get_task_history(self, task_id: str) -> List[str]:
+        with self.SessionLocal() as session:
+            history = session.execute(
+                select(Chunk.content)
+                .where(Chunk.task_id == task_id)
+                .order_by(Chunk.id)
+            ).scalars().all()
+            return list(history)
+
+    def _add_summary(self, task_id: str, content: str, last_chunk_id: int | None) -> None:
+        with self.SessionLocal() as session:
+            created = self._ensure_task(session, task_id)
+            session.add(Summary(task_id=task_id, content=content, last_chunk_id=last_chunk_id))
+            session.commit()
+        self._invalidate(f"summary:{task_id}", *([f"task:{task_id}"] if created else []))
+
+    def _get_latest_summary(self, task_id: str) -> Summary | None:
+        with self.SessionLocal() as session:
+            return session.execute(
+                select(Summary)
+                .where(Summary.task_id == task_id)
+                .order_by(Summary.id.desc())
+                .limit(1)
+            ).scalars().first()
+
+    def _list_tasks(self, status: str | None = None) -> list[Task]:
+        with self.SessionLocal() as session:
+            query = select(Task)
+            if status is not None:
+                query = query.where(Task.status == status)
+            return list(session.execute(query).scalars().all())
+
+    def _get_chunks(self, task_id: str, after_id: int | None) -> list[Chunk]:
+        with self.SessionLocal() as session:
+            query = select(Chunk).where(Chunk.task_id == task_id)
+            if after_id is not None:
+                query = query.where(Chunk.id > after_id)
+            records = session.execute(query.order_by(Chunk.id)).scalars().all()
+            return list(records)
+
+    def _get_recent_chunks(
+        self, task_id: str, budget: int, measure: Callable[[str], int]
+    ) -> List[Tuple[int, str]]:
+        with self.SessionLocal() as session:
+            # Stream newest-first and stop at the budget, so only the rows
+            # that are returned are ever fetched from SQLite.
+            result = session.execute(
+                select(Chunk.id, Chunk.content)
+                .where(Chunk.task_id == task_id)
+                .order_by(Chunk.id.desc())
+                .execution_options(yield_per=64)
+            )
+            picked: List[Tuple[int, str]] = []
+            used = 0
+            try:
+                for chunk_id, content in result:
+                    cost = measure(content or "")
+                    if used + cost > budget:
+                        break
+                    picked.append((chunk_id, content or ""))
+                    used += cost
+            finally:
+                result.close()
+            picked.reverse()
+            return picked
+
+    def _get_chunks_since(self, after_id: int, limit: int) -> list[Chunk]:
+        with self.SessionLocal() as session:
+            records = session.execute(
+                select(Chunk).where(Chunk.id > after_id).order_by(Chunk.id).limit(limit)
+            ).scalars().all()
+            return list(records)
+
+    def _get_watermark(self, name: str) -> int:
+        with self.SessionLocal() as session:
+            progress = session.get(IngestionProgress, name)
+            return progress.last_chunk_id if progress else 0
+
+    def _set_watermark(self, name: str, chunk_id: int) -> None:
+        with self.SessionLocal() as session:
+            progress = session.get(IngestionProgress, name)
+            if progress is None:
+                session.add(IngestionProgress(name=name, last_chunk_id=chunk_id))
+            else:
+                progress.last_chunk_id = chunk_id
+            session.commit()
+
+    def _claim_tasks(self, owner: str, limit: int, lease_seconds: float, max_attempts: int) -> list[Task]:
+        now = time.time()
+        # A unique token per claim lets us read back exactly the rows this
+        # single UPDATE took, even if other runners claim concurrently.
+        token = f"{owner}:{uuid.uuid4().hex[:8]}"
+        expired = and_(Task.status == "running", Task.lease_expires_at < now)
+        with self.SessionLocal() as session:
+            exhausted = session.execute(
+                select(Task.id).where(expired, Task.attempts >= max_attempts)
+            ).scalars().all()
+            if exhausted:
+                session.execute(
+                    update(Task)
+                    .where(Task.id.in_(exhausted), expired)
+                    .values(status="failed", lease_owner=None, lease_expires_at=None)
+                    .execution_options(synchronize_session=False)
+                )
+            claimable = or_(Task.status == "pending", expired)
+            candidates = (
+                select(Task.id).where(claimable).order_by(Task.created_at).limit(limit).scalar_subquery()
+            )
+            session.execute(
+                update(Task)
+                .where(Task.id.in_(candidates), claimable)
+                .values(
+                    status="running",
+                    lease_owner=token,
+                    lease_expires_at=now + lease_seconds,
+                    attempts=Task.attempts + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            claimed = list(session.execute(select(Task).where(Task.lease_owner == token)).scalars().all())
+        self._invalidate(*(f"task:{task_id}" for task_id in [*exhausted, *(task.id for task in claimed)]))
+        return claimed
+
+    def _renew_leases(self, leases: List[Tuple[str, str]], lease_seconds: float) -> int:
+        expires = time.time() + lease_seconds
+        renewed = 0
+        with self.SessionLocal() as session:
+            for task_id, token in leases:
+                result = session.execute(
+                    update(Task)
+                    .where(Task.id == task_id, Task.lease_owner == token)
+                    .values(lease_expires_at=expires)
+                    .execution_options(synchronize_session=False)
+                )
+                renewed += result.rowcount
+            session.commit()
+        self._invalidate(*(f"task:{task_id}" for task_id, _ in leases))
+        return renewed
+
+    def _release_task(self, task_id: str, token: str, status: str) -> bool:
+        with self.SessionLocal() as session:
+            task = session.get(Task, task_id)
+            if task is None or task.lease_owner != token:
+                return False
+            if task.status == "running":
+                task.status = status
+            task.lease_owner = None
+            task.lease_expires_at = None
+            session.commit()
+        self._invalidate(f"task:{task_id}")
+        return True
+
+    def _get_task_record(self, task_id: str) -> Task | None:
+        with self.SessionLocal() as session:
+            return session.get(Task, task_id)
 
     async def create_task(self, task_id: str, prompt: str) -> None:
         """Create a new task."""
-        session = self.SessionLocal()
-        self._ensure_task(session, task_id, prompt)
-        session.close()
+        await self._submit(self._create_task, task_id, prompt)
 
     async def update_status(self, task_id: str, status: str) -> None:
         """Update task status."""
-        session = self.SessionLocal()
-        task = session.get(Task, task_id)
-        if task:
-            task.status = status
-            session.commit()
-        session.close()
+        await self._submit(self._update_status, task_id, status)
 
     async def get(self, task_id: str) -> Context:
         """Get task context."""
-        session = self.SessionLocal()
-        task = session.get(Task, task_id)
-        if not task:
-            session.close()
-            raise ValueError(f"Task with ID {task_id} not found")
-        
-        # Load history from chunks
-        chunks = session.execute(
-            select(Chunk)
-            .where(Chunk.task_id == task_id)
-            .order_by(Chunk.id)
-        ).scalars().all()
-        
-        context = Context(
-            task_id=task_id,
-            history=[c.content for c in chunks]
-        )
-        session.close()
-        return context
+        return await self._cached_read(f"ctx:{task_id}", f"chunks:{task_id}", self._get, task_id)
 
     async def add_chunk(self, task_id: str, content: str) -> None:
         """Add a chunk of content to the task."""
-        session = self.SessionLocal()
-        self._ensure_task(session, task_id)
-        
-        # Add to database
-        session.add(Chunk(task_id=task_id, content=content))
-        session.commit()
-        session.close()
+        await self._submit(self._add_chunk, task_id, content)
 
     async def get_task_history(self, task_id: str) -> List[str]:
         """Get task history."""
-        session = self.SessionLocal()
-        chunks = session.execute(
-            select(Chunk)
-            .where(Chunk.task_id == task_id)
-            .order_by(Chunk.id)
-        ).scalars().all()
-        history = [c.content for c in chunks]
-        session.close()
-        return history
-
-    async def add_summary(self, task_id: str, content: str) -> None:
-        """Add a summary to the task."""
-        session = self.SessionLocal()
-        self._ensure_task(session, task_id)
-        session.add(Summary(task_id=task_id, content=content))
-        session.commit()
-        session.close()
+        return await self._cached_read(f"history:{task_id}", f"chunks:{task_id}", self._get_task_history, task_id)
+
+    async def add_summary(self, task_id: str, content: str, last_chunk_id: int | None = None) -> None:
+        """Add a summary to the task.
+
+        ``last_chunk_id`` records the newest chunk the summary covers.
+        """
+        await self._submit(self._add_summary, task_id, content, last_chunk_id)
+
+    async def get_latest_summary(self, task_id: str) -> Summary | None:
+        """Return the most recent summary of a task, if any."""
+        return await self._cached_read(f"summary:{task_id}", f"summary:{task_id}", self._get_latest_summary, task_id)
 
     async def list_tasks(self, status: str | None = None) -> list[Task]:
         """List all tasks."""
-        session = self.SessionLocal()
-        query = select(Task)
-        if status is not None:
-            query = query.where(Task.status == status)
-        tasks = session.execute(query).scalars().all()
-        session.close()
-        return tasks
-
-    async def get_chunks(self, task_id: str) -> list[Chunk]:
-        """Return all chunk records for a task."""
-        session = self.SessionLocal()
-        records = session.execute(
-            select(Chunk).where(Chunk.task_id == task_id).order_by(Chunk.id)
-        ).scalars().all()
-        session.close()
-        return records
+        return await self._read(self._list_tasks, status)
+
+    async def get_chunks(self, task_id: str, after_id: int | None = None) -> list[Chunk]:
+        """Return chunk records for a task, optionally only those after ``after_id``."""
+        return await self._cached_read(f"chunks:{task_id}:{after_id}", f"chunks:{task_id}", self._get_chunks, task_id, after_id)
+
+    async def get_task(self, task_id: str) -> Task | None:
+        """Async counterpart of :meth:`get_task_record`."""
+        return await self._cached_read(f"task:{task_id}", f"task:{task_id}", self._get_task_record, task_id)
+
+    async def get_recent_chunks(
+        self, task_id: str, budget: int, measure: Callable[[str], int] = len
+    ) -> List[Tuple[int, str]]:
+        """Return ``(id, content)`` of the newest chunks fitting in ``budget``.
+
+        Sizes are computed with ``measure``; results are oldest first.
+        """
+        name = _measure_key(measure)
+        if name is None:
+            return await self._read(self._get_recent_chunks, task_id, budget, measure)
+        key = f"recent:{task_id}:{budget}:{name}"
+        return await self._cached_read(key, f"chunks:{task_id}", self._get_recent_chunks, task_id, budget, measure)
+
+    async def get_chunks_since(self, after_id: int, limit: int = 1000) -> list[Chunk]:
+        """Return up to ``limit`` chunks of any task with ids above ``after_id``."""
+        return await self._read(self._get_chunks_since, after_id, limit)
+
+    async def get_watermark(self, name: str) -> int:
+        """Return the last chunk id recorded for consumer ``name`` (0 if none)."""
+        return await self._read(self._get_watermark, name)
+
+    async def set_watermark(self, name: str, chunk_id: int) -> None:
+        """Record that consumer ``name`` has processed chunks up to ``chunk_id``."""
+        await self._submit(self._set_watermark, name, chunk_id)
+
+    async def claim_tasks(
+        self, owner: str, limit: int = 1, lease_seconds: float = 30.0, max_attempts: int = 3
+    ) -> list[Task]:
+        """Atomically lease up to ``limit`` runnable tasks to ``owner``.
+
+        Runnable tasks are pending ones and running ones whose lease has
+        expired. Claimed tasks move to ``running``; their ``lease_owner``
+        holds the token needed to renew or release them. Tasks whose lease
+        expired ``max_attempts`` times are marked failed instead.
+        """
+        return await self._submit(self._claim_tasks, owner, limit, lease_seconds, max_attempts)
+
+    async def renew_leases(self, leases: List[Tuple[str, str]], lease_seconds: float = 30.0) -> int:
+        """Extend leases given as ``(task_id, token)``; returns how many are still held."""
+        return await self._submit(self._renew_leases, leases, lease_seconds)
+
+    async def release_task(self, task_id: str, token: str, status: str = "completed") -> bool:
+        """Drop a lease, setting ``status`` if the handler left the task running."""
+        return await self._submit(self._release_task, task_id, token, status)
 
     def get_task_record(self, task_id: str) -> Task | None:
         """Return the raw task database record."""
-        session = self.SessionLocal()
-        task = session.get(Task, task_id)
-        session.close()
+        if self.cache is not None:
+            key = f"task:{task_id}"
+            hit = self._cache_get(key, key)
+            if hit is not None:
+                return hit[0]
+            generation = self.cache.generation(key)
+        task = self._read_executor.submit(self._get_task_record, task_id).result()
+        if self.cache is not None:
+            self.cache.set(key, task, key, generation)
         return task
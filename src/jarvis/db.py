@@ -1,45 +1,351 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
-from sqlalchemy import Column, DateTime, Integer, String, Text, ForeignKey, create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    create_engine,
+    event,
+    func,
+    insert,
+    select,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, column_property, declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.types import TypeDecorator
 
 Base = declarative_base()
 
+# Blob bodies at least this many UTF-8 bytes long are zlib-compressed.
+COMPRESS_MIN_BYTES = 512
+
+# Codec marker stored as the first byte of every blob body.
+_RAW = b"r"
+_ZLIB = b"z"
+
+
+class _InflateCache:
+    """Recently decompressed bodies keyed by their compressed bytes.
+
+    Duplicate chunks share a body, so scans over them decompress it once.
+    Bodies larger than a sixteenth of ``max_bytes`` are not kept.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def inflate(self, packed: bytes) -> str:
+        with self._lock:
+            text = self._entries.get(packed)
+            if text is not None:
+                self._entries.move_to_end(packed)
+                return text
+        text = zlib.decompress(packed).decode("utf-8")
+        size = len(packed) + len(text)
+        if size <= self.max_bytes // 16:
+            with self._lock:
+                if packed not in self._entries:
+                    self._entries[packed] = text
+                    self._bytes += size
+                    while self._bytes > self.max_bytes:
+                        old, old_text = self._entries.popitem(last=False)
+                        self._bytes -= len(old) + len(old_text)
+        return text
+
+
+_inflate_cache = _InflateCache()
+
+
+class StoredText(TypeDecorator):
+    """Text stored as bytes, zlib-compressed when that makes it smaller.
+
+    Plain strings read back unchanged, so a column may mix these bodies
+    with ordinary ``TEXT`` values.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, min_bytes: int = COMPRESS_MIN_BYTES, level: int = 6) -> None:
+        super().__init__()
+        self.min_bytes = min_bytes
+        self.level = level
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+        raw = value.encode("utf-8")
+        if len(raw) >= self.min_bytes:
+            packed = zlib.compress(raw, self.level)
+            if len(packed) < len(raw):
+                return _ZLIB + packed
+        return _RAW + raw
+
+    def process_result_value(self, value: Any, dialect: Any) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        body = bytes(value)
+        if body[:1] == _ZLIB:
+            return _inflate_cache.inflate(body[1:])
+        return body[1:].decode("utf-8")
+
+
+def content_digest(text: str) -> bytes:
+    """Content address of a chunk body."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
 
 class Task(Base):
     __tablename__ = "tasks"
     id = Column(String, primary_key=True)
     prompt = Column(Text)
     status = Column(String, default="pending")
+    # Set while a runner holds the task; an expired lease can be reclaimed.
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(Float, nullable=True)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
 
     created_at = Column(DateTime, default=datetime.utcnow)
     chunks = relationship("Chunk", back_populates="task")
     summaries = relationship("Summary", back_populates="task")
 
+    __table_args__ = (Index("ix_tasks_status", "status"),)
+
+
+class Blob(Base):
+    """A distinct chunk body, stored once however many chunks repeat it."""
+    __tablename__ = "blobs"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    digest = Column(LargeBinary, nullable=False, unique=True)
+    data = Column(StoredText(), nullable=False)
+
 
-    
-    
 class Chunk(Base):
     __tablename__ = "chunks"
     id = Column(Integer, primary_key=True, autoincrement=True)
     task_id = Column(String, ForeignKey("tasks.id"))
-    content = Column(Text)
+    # Text of chunks written before blob storage; new chunks use ``blob_id``.
+    inline_content = Column("content", Text, nullable=True)
+    blob_id = Column(Integer, ForeignKey("blobs.id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Read-only: set ``blob_id`` (see :func:`store_blobs`) to write a body.
+    content = column_property(
+        func.coalesce(
+            inline_content,
+            select(Blob.data).where(Blob.id == blob_id).correlate_except(Blob).scalar_subquery(),
+            type_=StoredText(),
+        )
+    )
     task = relationship("Task", back_populates="chunks")
 
+    __table_args__ = (Index("ix_chunks_task_id_id", "task_id", "id"),)
+
+
 class Summary(Base):
     __tablename__ = "summaries"
     id = Column(Integer, primary_key=True, autoincrement=True)
     task_id = Column(String, ForeignKey("tasks.id"))
     content = Column(Text)
+    # Highest chunk id folded into this summary; later chunks are still pending.
+    last_chunk_id = Column(Integer, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     task = relationship("Task", back_populates="summaries")
 
 
-def get_engine(url: str = "sqlite:///jarvis.db"):
-    return create_engine(url, future=True)
+class IngestionProgress(Base):
+    """Highest chunk id a background consumer has durably processed."""
+    __tablename__ = "ingestion_progress"
+    name = Column(String, primary_key=True)
+    last_chunk_id = Column(Integer, default=0, nullable=False)
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """SQLite tuning applied to every connection an engine opens.
+
+    ``None`` leaves the SQLite default in place. ``read_workers`` is the
+    number of threads :class:`~jarvis.context_manager.ContextManager` uses for
+    reads; the connection pool is sized to fit them plus the writer.
+    """
+
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    cache_size: Optional[int] = None
+    mmap_size: Optional[int] = None
+    busy_timeout: Optional[int] = None
+    temp_store: Optional[str] = None
+    read_workers: int = 0
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+
+    def pragmas(self) -> Dict[str, Union[str, int]]:
+        names = ("journal_mode", "synchronous", "cache_size", "mmap_size", "busy_timeout", "temp_store")
+        return {name: getattr(self, name) for name in names if getattr(self, name) is not None}
+
+
+PROFILES: Dict[str, StorageProfile] = {
+    # SQLite defaults: rollback journal, full fsync, no extra readers.
+    "default": StorageProfile(),
+    # WAL lets readers run alongside the writer; NORMAL sync only fsyncs at
+    # checkpoints, which is durable against application crashes.
+    "production": StorageProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-64000,  # 64 MiB
+        mmap_size=256 * 1024 * 1024,
+        busy_timeout=5000,
+        temp_store="MEMORY",
+        read_workers=4,
+    ),
+}
+
+
+def get_profile(profile: Union[str, StorageProfile, None]) -> StorageProfile:
+    if profile is None:
+        return PROFILES["default"]
+    if isinstance(profile, StorageProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile: {profile}") from None
+
+
+def is_memory_url(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def get_engine(url: str = "sqlite:///jarvis.db", profile: Union[str, StorageProfile, None] = None) -> Engine:
+    profile = get_profile(profile)
+    kwargs = {}
+    if url.startswith("sqlite") and not is_memory_url(url) and profile.read_workers:
+        kwargs.update(
+            poolclass=QueuePool,
+            pool_size=profile.read_workers + 1,
+            max_overflow=profile.max_overflow,
+            pool_timeout=profile.pool_timeout,
+            connect_args={"check_same_thread": False},
+        )
+    engine = create_engine(url, future=True, **kwargs)
+
+    pragmas = profile.pragmas()
+    if url.startswith("sqlite") and pragmas:
+        @event.listens_for(engine, "connect")
+        def _apply_pragmas(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return engine
 
 
 def get_sessionmaker(engine):
     return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def store_blobs(conn: Union[Connection, Session], texts: Sequence[str]) -> List[int]:
+    """Return the blob id of each of ``texts``, storing bodies not seen before."""
+    digests = [content_digest(text) for text in texts]
+    ids: Dict[bytes, int] = {}
+
+    def _lookup(wanted: List[bytes]) -> None:
+        # Stay well below SQLite's limit on bound parameters.
+        for i in range(0, len(wanted), 500):
+            rows = conn.execute(select(Blob.digest, Blob.id).where(Blob.digest.in_(wanted[i : i + 500])))
+            ids.update((bytes(digest), blob_id) for digest, blob_id in rows)
+
+    _lookup(list(dict.fromkeys(digests)))
+    missing = {digest: text for digest, text in zip(digests, texts) if digest not in ids}
+    if missing:
+        # OR IGNORE: another process may store the same body concurrently.
+        conn.execute(
+            insert(Blob.__table__).prefix_with("OR IGNORE"),
+            [{"digest": digest, "data": text} for digest, text in missing.items()],
+        )
+        _lookup(list(missing))
+    return [ids[digest] for digest in digests]
+
+
+def _create_hot_column_indexes(conn: Connection) -> None:
+    """Index the columns chunk and task lookups filter on."""
+    for table in (Task.__table__, Chunk.__table__):
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _add_summary_last_chunk_id(conn: Connection) -> None:
+    """Track which chunks a rolling summary already covers."""
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(summaries)")}
+    if "last_chunk_id" not in columns:
+        conn.exec_driver_sql("ALTER TABLE summaries ADD COLUMN last_chunk_id INTEGER")
+
+
+def _add_task_leases(conn: Connection) -> None:
+    """Columns runners use to claim tasks with expiring leases."""
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tasks)")}
+    if "lease_owner" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN lease_owner VARCHAR")
+    if "lease_expires_at" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN lease_expires_at FLOAT")
+    if "attempts" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tasks ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+
+def _move_chunk_content_to_blobs(conn: Connection, batch_size: int = 5000) -> None:
+    """Deduplicate and compress chunk bodies into the ``blobs`` table.
+
+    Freed pages are reused by later writes; run ``VACUUM`` to shrink the file.
+    """
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(chunks)")}
+    if "blob_id" not in columns:
+        conn.exec_driver_sql("ALTER TABLE chunks ADD COLUMN blob_id INTEGER REFERENCES blobs (id)")
+    while True:
+        rows = conn.exec_driver_sql(
+            "SELECT id, content FROM chunks WHERE content IS NOT NULL ORDER BY id LIMIT ?", (batch_size,)
+        ).all()
+        if not rows:
+            return
+        blob_ids = store_blobs(conn, [content for _, content in rows])
+        conn.exec_driver_sql(
+            "UPDATE chunks SET blob_id = ?, content = NULL WHERE id = ?",
+            [(blob_id, chunk_id) for blob_id, (chunk_id, _) in zip(blob_ids, rows)],
+        )
+
+
+# Ordered schema migrations. The number of applied steps is tracked in
+# SQLite's ``user_version`` so each step runs once per database.
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    _create_hot_column_indexes,
+    _add_summary_last_chunk_id,
+    _add_task_leases,
+    _move_chunk_content_to_blobs,
+]
+
+
+def migrate(engine: Engine) -> None:
+    """Create missing tables and bring an existing schema up to date."""
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+        for number, step in enumerate(MIGRATIONS[version:], start=version + 1):
+            step(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {number}")
@@ -0,0 +1,195 @@
+"""Background pipeline that mirrors stored chunks into a vector store."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .context_manager import ChunkRecord, ContextManager
+from .utils.loop import LoopRunner, get_runner
+from .vector_store import VectorStore
+
+
+def chunk_doc_id(chunk_id: int) -> str:
+    """Vector store id of the document mirroring chunk ``chunk_id``."""
+    return f"chunk-{chunk_id}"
+
+
+class EmbeddingIngestor:
+    """Embed committed chunks in micro-batches off the request path.
+
+    ``ContextManager`` hands every committed chunk to :meth:`_on_chunks`,
+    which only enqueues it. A worker thread groups queued chunks into
+    batches of up to ``batch_size`` (or whatever arrived within
+    ``max_delay`` seconds) and writes each batch with one
+    ``store.add_many`` call.
+
+    The queue is bounded by ``max_queue``. When it is full, new chunks are
+    not queued; the worker later re-reads them from SQLite, so writers are
+    never blocked and nothing is lost. Chunks committed by other processes
+    never reach the queue; a gap in the ids of a batch makes the worker
+    read the missing range from SQLite before moving past it. Progress is checkpointed as a chunk
+    id watermark in the ``ingestion_progress`` table, after the store has
+    been persisted, so a restarted ingestor resumes where the last
+    checkpoint left off. Re-ingesting a chunk is harmless because vector ids
+    are derived from chunk ids.
+    """
+
+    def __init__(
+        self,
+        context_manager: ContextManager,
+        store: VectorStore,
+        name: str = "vector_store",
+        batch_size: int = 64,
+        max_delay: float = 0.5,
+        max_queue: int = 1024,
+        checkpoint_interval: float = 5.0,
+        runner: Optional[LoopRunner] = None,
+    ) -> None:
+        self.context_manager = context_manager
+        self.store = store
+        self.name = name
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.checkpoint_interval = checkpoint_interval
+        self.runner = runner or get_runner()
+        self._queue: "queue.Queue[ChunkRecord]" = queue.Queue(maxsize=max_queue)
+        # Set when chunks were skipped (queue full, or not yet caught up).
+        self._backlog = threading.Event()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ingested_id = 0
+        self._checkpointed_id = 0
+        self._last_checkpoint = time.monotonic()
+        self.ingested = 0
+        self.batches = 0
+        self.overflows = 0
+
+    def start(self) -> None:
+        """Resume from the stored watermark and start the worker thread."""
+        if self._thread is not None:
+            return
+        self._ingested_id = self._checkpointed_id = self.runner.run(
+            self.context_manager.get_watermark(self.name)
+        )
+        self._backlog.set()
+        self._stop.clear()
+        self.context_manager.add_chunk_listener(self._on_chunks)
+        self._thread = threading.Thread(target=self._worker, name=f"jarvis-ingest-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ingest what is already queued, checkpoint and stop the worker."""
+        if self._thread is None:
+            return
+        self.context_manager.remove_chunk_listener(self._on_chunks)
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until every committed chunk has been ingested and checkpointed."""
+        deadline = time.monotonic() + timeout
+        self._backlog.set()
+        while time.monotonic() < deadline:
+            self._idle.clear()
+            idle = self._idle.wait(max(deadline - time.monotonic(), 0))
+            if idle and self._queue.empty() and not self._backlog.is_set():
+                return True
+        return False
+
+    def _on_chunks(self, records: List[ChunkRecord]) -> None:
+        for record in records:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self.overflows += 1
+                self._backlog.set()
+                return
+
+    def _worker(self) -> None:
+        while True:
+            if self._backlog.is_set():
+                self._catch_up()
+            batch = self._next_batch()
+            if batch:
+                self._ingest(batch)
+            elif self._stop.is_set():
+                break
+            else:
+                self._checkpoint(force=True)
+                self._idle.set()
+        self._checkpoint(force=True)
+        self._idle.set()
+
+    def _next_batch(self) -> List[ChunkRecord]:
+        batch: List[ChunkRecord] = []
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._backlog.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _catch_up(self) -> None:
+        """Ingest chunks committed while the queue could not take them."""
+        self._backlog.clear()
+        while True:
+            chunks = self.runner.run(
+                self.context_manager.get_chunks_since(self._ingested_id, self.batch_size)
+            )
+            if not chunks:
+                return
+            self._store([(c.id, c.task_id, c.content) for c in chunks])
+
+    def _ingest(self, batch: List[ChunkRecord]) -> None:
+        fresh = sorted(record for record in batch if record[0] > self._ingested_id)
+        if not fresh:
+            return
+        expected = range(self._ingested_id + 1, self._ingested_id + 1 + len(fresh))
+        if [chunk_id for chunk_id, _, _ in fresh] != list(expected):
+            # Ids are missing below this batch, e.g. chunks committed by
+            # another process, whose listeners are not ours. Advancing the
+            # watermark past them would skip them for good, so read
+            # everything committed since the watermark instead.
+            self._catch_up()
+            return
+        self._store(fresh)
+
+    def _store(self, fresh: List[ChunkRecord]) -> None:
+        self.store.add_many(
+            [chunk_doc_id(chunk_id) for chunk_id, _, _ in fresh],
+            [content or "" for _, _, content in fresh],
+            [{"task_id": task_id, "chunk_id": chunk_id} for chunk_id, task_id, _ in fresh],
+        )
+        self._ingested_id = max(chunk_id for chunk_id, _, _ in fresh)
+        self.ingested += len(fresh)
+        self.batches += 1
+        self._checkpoint()
+
+    def _checkpoint(self, force: bool = False) -> None:
+        if self._ingested_id == self._checkpointed_id:
+            return
+        if not force and time.monotonic() - self._last_checkpoint < self.checkpoint_interval:
+            return
+        self.store.persist()
+        self.runner.run(self.context_manager.set_watermark(self.name, self._ingested_id))
+        self._checkpointed_id = self._ingested_id
+        self._last_checkpoint = time.monotonic()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "ingested": self.ingested,
+            "batches": self.batches,
+            "queued": self._queue.qsize(),
+            "overflows": self.overflows,
+            "last_chunk_id": self._ingested_id,
+            "checkpointed_chunk_id": self._checkpointed_id,
+        }
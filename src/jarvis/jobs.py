@@ -0,0 +1,86 @@
+"""Bounded in-process execution of background jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a job is submitted while too many are already waiting."""
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = "queued"  # queued -> running -> completed | failed
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+class JobManager:
+    """Run coroutines as background jobs with bounded concurrency.
+
+    At most ``max_concurrency`` jobs run at once; up to ``max_queued`` more
+    wait their turn and further submissions raise :class:`QueueFullError`.
+    Finished jobs are kept for ``retention`` seconds so clients can poll
+    their results. Must be used from within a running event loop.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queued: int = 1000, retention: float = 3600.0) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.retention = retention
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(self, factory: Callable[[], Awaitable[Any]]) -> Job:
+        """Schedule ``factory()`` and return its job record immediately."""
+        self._prune()
+        queued = sum(1 for job in self.jobs.values() if job.status == "queued")
+        if queued >= self.max_queued:
+            raise QueueFullError("Too many queued jobs")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        job = Job(id=str(uuid.uuid4()))
+        self.jobs[job.id] = job
+        task = asyncio.get_running_loop().create_task(self._run(job, factory))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    async def _run(self, job: Job, factory: Callable[[], Awaitable[Any]]) -> None:
+        async with self._semaphore:
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await factory()
+                job.status = "completed"
+            except Exception as exc:
+                job.error = str(exc)
+                job.status = "failed"
+            finally:
+                job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [
+            job.id for job in self.jobs.values() if job.finished_at is not None and job.finished_at < cutoff
+        ]:
+            del self.jobs[job_id]
+
+    async def shutdown(self) -> None:
+        """Cancel unfinished jobs."""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
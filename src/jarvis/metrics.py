@@ -0,0 +1,309 @@
+"""In-process metrics: stage latency histograms, counters and per-task spans.
+
+Everything is recorded into the module-level :data:`metrics` registry, which
+the API exposes in Prometheus text format at ``/metrics`` and the CLI prints
+with ``stats`` (in another process, by parsing ``/metrics`` with
+:func:`parse_snapshot`). Set ``JARVIS_METRICS=0`` to disable recording; timers then
+return a shared no-op context manager and counters return immediately.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .utils.chunker import count_tokens
+
+# Upper bounds (seconds) of the latency histogram buckets.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+STAGE_SECONDS = "jarvis_stage_seconds"
+ERRORS = "jarvis_errors_total"
+CACHE_REQUESTS = "jarvis_cache_requests_total"
+LLM_CALLS = "jarvis_llm_calls_total"
+LLM_TOKENS = "jarvis_llm_tokens_total"
+
+HELP = {
+    STAGE_SECONDS: "Time spent per request stage.",
+    ERRORS: "Exceptions raised per request stage.",
+    CACHE_REQUESTS: "Cache lookups by cache and result.",
+    LLM_CALLS: "Model generations that reached a backend.",
+    LLM_TOKENS: "Estimated prompt and completion tokens sent to models.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    duration: float
+    labels: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class _NoopTimer:
+    def __enter__(self) -> "_NoopTimer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NOOP = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "task_id", "labels", "started", "wall")
+
+    def __init__(self, metrics: "Metrics", stage: str, task_id: Optional[str], labels: Dict[str, str]) -> None:
+        self.metrics = metrics
+        self.stage = stage
+        self.task_id = task_id
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        self.metrics.observe(STAGE_SECONDS, elapsed, stage=self.stage, **self.labels)
+        if exc_type is not None:
+            self.metrics.inc(ERRORS, stage=self.stage)
+        if self.task_id is not None:
+            error = exc_type.__name__ if exc_type is not None else None
+            self.metrics.add_span(self.task_id, Span(self.stage, self.wall, elapsed, self.labels, error))
+
+
+def _key(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    """Thread-safe registry of histograms, counters and task spans."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        max_traces: int = 256,
+        max_spans: int = 64,
+    ) -> None:
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.max_traces = max_traces
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._traces: "OrderedDict[str, Deque[Span]]" = OrderedDict()
+
+    def timer(self, stage: str, task_id: Optional[str] = None, **labels: str):
+        """Context manager timing one ``stage``; with ``task_id`` it also records a span."""
+        if not self.enabled:
+            return _NOOP
+        return _Timer(self, stage, task_id, labels)
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _key(labels)
+        slot = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[slot] += 1
+            histogram.total += seconds
+            histogram.count += 1
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def add_span(self, task_id: str, span: Span) -> None:
+        with self._lock:
+            spans = self._traces.get(task_id)
+            if spans is None:
+                spans = self._traces[task_id] = deque(maxlen=self.max_spans)
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            else:
+                self._traces.move_to_end(task_id)
+            spans.append(span)
+
+    def trace(self, task_id: str) -> List[Span]:
+        """Spans recorded for ``task_id``, oldest first."""
+        with self._lock:
+            return list(self._traces.get(task_id, ()))
+
+    def _quantile(self, histogram: _Histogram, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        rank = q * histogram.count
+        seen = 0
+        for bound, count in zip(self.buckets, histogram.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Stage latency summaries and counter values as plain data."""
+        with self._lock:
+            stages = {
+                ",".join(f"{k}={v}" for k, v in key): {
+                    "count": h.count,
+                    "mean": h.total / h.count if h.count else 0.0,
+                    "p50": self._quantile(h, 0.5),
+                    "p95": self._quantile(h, 0.95),
+                }
+                for key, h in self._histograms.get(STAGE_SECONDS, {}).items()
+            }
+            counters = {
+                name + _format_labels(key): value
+                for name, series in self._counters.items()
+                for key, value in series.items()
+            }
+        return {"stages": stages, "counters": counters}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, h.counts):
+                        cumulative += count
+                        le = _format_labels(key, f'le="{bound}"')
+                        lines.append(f"{name}_bucket{le} {cumulative}")
+                    le = _format_labels(key, 'le="+Inf"')
+                    lines.append(f"{name}_bucket{le} {h.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._traces.clear()
+
+
+def record_llm_call(model: str, prompt: str, response: str) -> None:
+    """Count one backend generation and its estimated token usage."""
+    if not metrics.enabled:
+        return
+    metrics.inc(LLM_CALLS, model=model)
+    metrics.inc(LLM_TOKENS, count_tokens(prompt), model=model, kind="prompt")
+    metrics.inc(LLM_TOKENS, count_tokens(response or ""), model=model, kind="completion")
+
+
+_SAMPLE = re.compile(r"^([A-Za-z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)$")
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+_UNESCAPE = {"\\\\": "\\", '\\"': '"', "\\n": "\n"}
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\[\\\"n]", lambda m: _UNESCAPE[m.group(0)], value)
+
+
+def parse_snapshot(text: str) -> Dict[str, Any]:
+    """Rebuild :meth:`Metrics.snapshot` from :meth:`Metrics.render` output.
+
+    Lets a separate process, such as the CLI, summarise what a running API
+    serves at ``/metrics``. Quantiles are bucket upper bounds, as locally.
+    """
+    types: Dict[str, str] = {}
+    buckets: Dict[str, List[Tuple[float, float]]] = {}
+    totals: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    counters: Dict[str, float] = {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(maxsplit=3)
+            types[name] = kind
+            continue
+        match = _SAMPLE.match(line)
+        if match is None:
+            continue
+        name, raw, value = match.groups()
+        if types.get(name) == "counter":
+            counters[name + ("{" + raw + "}" if raw else "")] = float(value)
+            continue
+        base, _, suffix = name.rpartition("_")
+        if base != STAGE_SECONDS:
+            continue
+        labels = [(k, _unescape(v)) for k, v in _LABEL.findall(raw or "")]
+        key = ",".join(f"{k}={v}" for k, v in labels if k != "le")
+        if suffix == "bucket":
+            le = dict(labels).get("le", "+Inf")
+            if le != "+Inf":
+                buckets.setdefault(key, []).append((float(le), float(value)))
+        elif suffix == "sum":
+            totals[key] = float(value)
+        elif suffix == "count":
+            counts[key] = int(float(value))
+
+    def quantile(key: str, q: float) -> float:
+        rank = q * counts[key]
+        for bound, cumulative in sorted(buckets.get(key, ())):
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    stages = {
+        key: {
+            "count": count,
+            "mean": totals.get(key, 0.0) / count if count else 0.0,
+            "p50": quantile(key, 0.5),
+            "p95": quantile(key, 0.95),
+        }
+        for key, count in counts.items()
+    }
+    return {"stages": stages, "counters": counters}
+
+
+metrics = Metrics(enabled=os.environ.get("JARVIS_METRICS", "1").lower() not in ("0", "false", "off", "no"))
@@ -6,6 +6,11 @@ from typing import Optional, Dict, Any
 
 from textwrap import shorten
 
+from .metrics import metrics, record_llm_call
+from .response_cache import ResponseCache
+from .semantic_cache import SemanticCache
+from .tier_selector import TierSelector, get_tier_selector
+
 # This module purposely avoids heavy LLM libraries. The ``ModelSelector``
 # provides just enough functionality for demos by returning a stubbed
 # response when asked to generate text.
@@ -17,10 +22,16 @@ class ModelSelector:
     def __init__(
             self,
             model_type: str = "bedrock",
-            model_config: Optional[Dict[str, Any]] = None
+            model_config: Optional[Dict[str, Any]] = None,
+            cache: Optional[ResponseCache] = None,
+            semantic_cache: Optional[SemanticCache] = None,
+            tier_selector: Optional[TierSelector] = None
     ) -> None:
         self.model_type = model_type
         self.model_config = model_config or {}
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.tier_selector = tier_selector or get_tier_selector()
         # Use a lightweight callable instead of heavy LLM dependencies.
         self.model = self._initialize_model()
         self.sllm_client = None
@@ -36,16 +47,50 @@ class ModelSelector:
 
         return simple_model
 
+    def select(self, prompt: str, task_type: Optional[str] = None) -> str:
+        """Return the model tier (``local``, ``medium`` or ``heavy``) for ``prompt``."""
+        return self.tier_selector.choose(prompt, task_type)
+
     def generate_response(
             self,
             prompt: str,
             system_prompt: Optional[str] = None,
             **kwargs: Any
     ) -> str:
-        """Generate a response using the selected model."""
+        """Generate a response using the selected model.
+
+        Responses are served from ``cache`` when an identical request
+        (model, prompts and parameters) has been answered before, and from
+        ``semantic_cache`` when a sufficiently similar prompt has.
+        """
+        def generate() -> str:
+            if self.semantic_cache is None:
+                return self._generate(prompt, system_prompt)
+            return self.semantic_cache.get_or_generate(
+                prompt,
+                lambda: self._generate(prompt, system_prompt),
+                namespace=self.model_id,
+                system_prompt=system_prompt,
+            )
+
+        if self.cache is None:
+            return generate()
+        return self.cache.get_or_generate(
+            self.model_id, prompt, generate, system_prompt=system_prompt, **kwargs
+        )
+
+    @property
+    def model_id(self) -> str:
+        """Identifier of the configured model, used in cache keys."""
+        return f"{self.model_type}:{self.model_config.get('model_id', 'default')}"
+
+    def _generate(self, prompt: str, system_prompt: Optional[str]) -> str:
         if system_prompt:
             prompt = f"{system_prompt}\n\n{prompt}"
-        return self.model(prompt)
+        with metrics.timer("llm", model=self.model_id):
+            response = self.model(prompt)
+        record_llm_call(self.model_id, prompt, response)
+        return response
 
     def analyze_code(
             self,
@@ -62,8 +107,11 @@ class ModelSelector:
             self,
             code: str,
             detail_level: str = "detailed",
+            context: Optional[str] = None,
             **kwargs: Any
     ) -> str:
-        """Explain code using the selected model."""
+        """Explain code using the selected model, in light of the task's ``context``."""
         prompt = f"Explain this code in {detail_level} detail:\n\n{code}"
+        if context:
+            prompt = f"{context}\n\n{prompt}"
         return self.generate_response(prompt, **kwargs)
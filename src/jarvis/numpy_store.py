@@ -0,0 +1,330 @@
+"""In-process vector store backed by a contiguous NumPy matrix."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .vector_store import SearchResult, VectorStore
+
+Embedder = Callable[[Sequence[str]], np.ndarray]
+
+_TOKEN = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """Dependency-free text embedding via the hashing trick.
+
+    Word unigrams and bigrams are hashed into ``dim`` signed buckets and the
+    vector is L2-normalised. It captures lexical overlap only, which is enough
+    for near-duplicate detection; pass a model-backed embedder for semantics.
+    """
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = dim
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                # crc32 is stable across processes, unlike hash().
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            if "$eq" in condition and metadata.get(key) != condition["$eq"]:
+                return False
+            if "$ne" in condition and metadata.get(key) == condition["$ne"]:
+                return False
+            if "$in" in condition and metadata.get(key) not in condition["$in"]:
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class NumpyVectorStore(VectorStore):
+    """Vector store kept in process as a float32 matrix of unit vectors.
+
+    Top-k search is a single matrix product over all live rows (or, once
+    :meth:`build_ivf` has been called, over the rows of the ``nprobe``
+    nearest coarse clusters). Deleted rows are tombstoned and dropped on
+    :meth:`compact`/:meth:`persist`. With ``path`` set, state is loaded from
+    and persisted to that directory; ``mmap=True`` maps the saved matrix
+    read-only until the first write.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        embedder: Optional[Embedder] = None,
+        dim: int = 384,
+        mmap: bool = False,
+        nprobe: int = 8,
+    ) -> None:
+        self.path = path
+        self.embedder = embedder or HashingEmbedder(dim)
+        self.dim = dim
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._count = 0
+        self._live = np.zeros(0, dtype=bool)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        # Rows grouped by IVF cluster: (row order, start offset per cluster).
+        self._lists: Optional[tuple] = None
+        if path and os.path.exists(os.path.join(path, "meta.json")):
+            self._load(mmap)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # -- storage -----------------------------------------------------------
+
+    def _reserve(self, extra: int) -> None:
+        """Grow the backing arrays geometrically so appends stay amortised O(1)."""
+        needed = self._count + extra
+        capacity = self._vectors.shape[0]
+        if needed <= capacity and self._vectors.flags.writeable:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[: self._count] = self._vectors[: self._count]
+        live = np.zeros(new_capacity, dtype=bool)
+        live[: self._count] = self._live[: self._count]
+        assignments = np.zeros(new_capacity, dtype=np.int32)
+        assignments[: self._count] = self._assignments[: self._count]
+        self._vectors, self._live, self._assignments = vectors, live, assignments
+
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.asarray(self.embedder(texts), dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedder returned shape {vectors.shape}, expected (n, {self.dim})")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def add_many(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        if len(ids) != len(texts):
+            raise ValueError("ids and texts must have the same length")
+        if not ids:
+            return
+        # A repeated id keeps only its last entry, as if added one at a time.
+        last = {doc_id: n for n, doc_id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            ids = [ids[n] for n in keep]
+            texts = [texts[n] for n in keep]
+            if metadatas is not None:
+                metadatas = [metadatas[n] for n in keep]
+        vectors = self._embed(texts)
+        with self._lock:
+            self.delete(ids=[doc_id for doc_id in ids if doc_id in self._rows])
+            self._reserve(len(ids))
+            start, end = self._count, self._count + len(ids)
+            self._vectors[start:end] = vectors
+            self._live[start:end] = True
+            if self._centroids is not None:
+                self._assignments[start:end] = np.argmax(vectors @ self._centroids.T, axis=1)
+                self._lists = None
+            for offset, doc_id in enumerate(ids):
+                self._rows[doc_id] = start + offset
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(dict(m or {}) for m in (metadatas or [None] * len(ids)))
+            self._count = end
+
+    def get_document(self, doc_id: str) -> str:
+        with self._lock:
+            return self._texts[self._rows[doc_id]]
+
+    def delete(self, where: Optional[Dict[str, Any]] = None, ids: Optional[List[str]] = None) -> None:
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows]
+            else:
+                rows = list(self._rows.values())
+            if where is not None:
+                rows = [row for row in rows if _matches(self._metadatas[row], where)]
+            elif ids is None:
+                return
+            for row in rows:
+                self._live[row] = False
+                del self._rows[self._ids[row]]
+
+    def compact(self) -> None:
+        """Drop tombstoned rows and renumber the survivors."""
+        with self._lock:
+            keep = np.flatnonzero(self._live[: self._count])
+            if len(keep) == self._count:
+                return
+            self._vectors = np.ascontiguousarray(self._vectors[keep])
+            self._live = np.ones(len(keep), dtype=bool)
+            self._assignments = self._assignments[keep].copy()
+            self._ids = [self._ids[i] for i in keep]
+            self._texts = [self._texts[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+            self._count = len(keep)
+            self._lists = None
+
+    # -- search ------------------------------------------------------------
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, seed: int = 0) -> None:
+        """Partition the rows into ``nlist`` k-means clusters for coarse search.
+
+        Defaults to roughly ``sqrt(n)`` clusters. Queries then only score rows
+        in the ``nprobe`` clusters whose centroids are closest to the query.
+        """
+        with self._lock:
+            self.compact()
+            n = self._count
+            if n == 0:
+                return
+            nlist = min(nlist or max(int(np.sqrt(n)), 1), n)
+            data = self._vectors[:n]
+            rng = np.random.default_rng(seed)
+            # Train on a sample; assigning every row happens once at the end.
+            sample_size = min(n, max(40 * nlist, 10_000))
+            sample = data[np.sort(rng.choice(n, size=sample_size, replace=False))]
+            columns = np.ascontiguousarray(sample.T)
+            centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assignments = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.stack(
+                    [np.bincount(assignments, weights=column, minlength=nlist) for column in columns],
+                    axis=1,
+                )
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Empty clusters keep their previous centroid.
+                nonempty = norms[:, 0] > 0
+                centroids[nonempty] = sums[nonempty] / norms[nonempty]
+            self._centroids = centroids.astype(np.float32)
+            self._assignments = np.argmax(data @ self._centroids.T, axis=1).astype(np.int32)
+            self._lists = None
+
+    def _candidate_mask(self, where: Optional[Dict[str, Any]]) -> np.ndarray:
+        mask = self._live[: self._count].copy()
+        if where is not None:
+            for row in np.flatnonzero(mask):
+                if not _matches(self._metadatas[row], where):
+                    mask[row] = False
+        return mask
+
+    def search_many(
+        self, texts: Sequence[str], limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[SearchResult]]:
+        queries = self._embed(texts)
+        with self._lock:
+            mask = self._candidate_mask(where)
+            if self._centroids is None:
+                scores = queries @ self._vectors[: self._count].T
+                return [self._top_k(row_scores, mask, limit) for row_scores in scores]
+
+            if self._lists is None:
+                assignments = self._assignments[: self._count]
+                order = np.argsort(assignments, kind="stable")
+                starts = np.concatenate(([0], np.cumsum(np.bincount(assignments, minlength=len(self._centroids)))))
+                self._lists = (order, starts)
+            order, starts = self._lists
+
+            probes = min(self.nprobe, len(self._centroids))
+            nearest = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :probes]
+            results = []
+            for query, clusters in zip(queries, nearest):
+                rows = np.concatenate([order[starts[c] : starts[c + 1]] for c in clusters])
+                rows = rows[mask[rows]]
+                scores = self._vectors[rows] @ query
+                results.append(
+                    [(self._ids[rows[i]], s, self._metadatas[rows[i]]) for i, s in self._rank(scores, limit)]
+                )
+            return results
+
+    @staticmethod
+    def _rank(scores: np.ndarray, limit: int) -> List[tuple]:
+        if scores.size == 0 or limit <= 0:
+            return []
+        k = min(limit, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def _top_k(self, scores: np.ndarray, mask: np.ndarray, limit: int) -> List[SearchResult]:
+        rows = np.flatnonzero(mask)
+        ranked = self._rank(scores[rows], limit)
+        return [(self._ids[rows[i]], s, self._metadatas[rows[i]]) for i, s in ranked]
+
+    # -- persistence -------------------------------------------------------
+
+    def persist(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            self.compact()
+            os.makedirs(self.path, exist_ok=True)
+            tmp = os.path.join(self.path, "vectors.tmp.npy")
+            np.save(tmp, self._vectors[: self._count])
+            os.replace(tmp, os.path.join(self.path, "vectors.npy"))
+            meta = {
+                "dim": self.dim,
+                "ids": self._ids,
+                "texts": self._texts,
+                "metadatas": self._metadatas,
+                "centroids": self._centroids.tolist() if self._centroids is not None else None,
+                "assignments": self._assignments[: self._count].tolist(),
+            }
+            tmp = os.path.join(self.path, "meta.tmp.json")
+            with open(tmp, "w", encoding="utf-8") as handle:
+                json.dump(meta, handle)
+            os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    def _load(self, mmap: bool) -> None:
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"Stored vectors have dim {meta['dim']}, expected {self.dim}")
+        self._vectors = np.load(
+            os.path.join(self.path, "vectors.npy"), mmap_mode="r" if mmap else None
+        )
+        self._count = len(meta["ids"])
+        self._live = np.ones(self._count, dtype=bool)
+        self._ids = meta["ids"]
+        self._texts = meta["texts"]
+        self._metadatas = meta["metadatas"]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        if meta.get("centroids") is not None:
+            self._centroids = np.asarray(meta["centroids"], dtype=np.float32)
+            self._assignments = np.asarray(meta["assignments"], dtype=np.int32)
+            self._lists = None
+        else:
+            self._assignments = np.zeros(self._count, dtype=np.int32)
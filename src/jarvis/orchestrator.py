@@ -4,11 +4,20 @@ import asyncio
 import uuid
 from typing import Dict, Optional, Any
 
+from .context_builder import ContextBuilder
 from .context_manager import ContextManager
+from .metrics import metrics
 from .model_selector import ModelSelector
-from .agents.code import CodeAgent
-from .agents.file import FileAgent
+from .response_cache import ResponseCache
 from .agents.base import TaskRequest
+from .agents.registry import AgentRegistry, AgentRouter
+from .summaries import summarize_task
+from .utils.loop import LoopRunner, get_runner
+from .vector_store import VectorStore
+
+
+class TaskError(RuntimeError):
+    """A request the orchestrator could not handle, raised with ``raise_errors``."""
 
 
 class TaskOrchestrator:
@@ -17,64 +26,84 @@ class TaskOrchestrator:
     def __init__(
         self,
         context_manager: ContextManager,
-        model_config: Optional[Dict[str, Any]] = None
+        model_config: Optional[Dict[str, Any]] = None,
+        runner: Optional[LoopRunner] = None,
+        response_cache: Optional[ResponseCache] = None,
+        vector_store: Optional[VectorStore] = None,
+        registry: Optional[AgentRegistry] = None
     ) -> None:
         self.context_manager = context_manager
+        self.context_builder = ContextBuilder(context_manager, vector_store)
+        self.runner = runner or get_runner()
         self.model_selector = ModelSelector(
             model_type="sllm",
-            model_config=model_config
+            model_config=model_config,
+            cache=response_cache
         )
-        self.agents = {
-            "code": CodeAgent(context_manager, self.model_selector),
-            "file": FileAgent(context_manager, self.model_selector)
-        }
+        # Agents are built the first time a request is routed to them.
+        self.router = AgentRouter(context_manager, self.model_selector, registry)
 
     def _run(self, coro):
-        return asyncio.run(coro)
+        """Execute a coroutine on the shared long-lived event loop."""
+        return self.runner.run(coro)
 
     def create_task(self, prompt: str) -> str:
         """Create a new task and return its ID."""
+        return self._run(self.acreate_task(prompt))
+
+    async def acreate_task(self, prompt: str) -> str:
+        """Async counterpart of :meth:`create_task`."""
         task_id = str(uuid.uuid4())
-        self._run(self.context_manager.create_task(task_id, prompt))
+        await self.context_manager.create_task(task_id, prompt)
         return task_id
 
     def handle(self, task_id: str, user_input: str) -> str:
         """Handle a task with the appropriate agent."""
-        # Get task context
-        task = self._run(self.context_manager.get(task_id))
+        return self._run(self.ahandle(task_id, user_input))
+
+    async def ahandle(self, task_id: str, user_input: str, raise_errors: bool = False) -> str:
+        """Async counterpart of :meth:`handle`.
+
+        Problems are returned as ``"Error: ..."`` strings, or raised when
+        ``raise_errors`` is set: agent exceptions as they are, the rest as
+        :class:`TaskError`.
+        """
+        task = await self.context_manager.get_task(task_id)
         if not task:
-            return "Error: Task not found"
+            return self._error("Task not found", raise_errors)
 
         # Select appropriate agent
-        agent = self._select_agent(user_input)
+        with metrics.timer("route", task_id):
+            agent = self._select_agent(user_input)
         if not agent:
-            return "Error: No suitable agent found for this request"
+            return self._error("No suitable agent found for this request", raise_errors)
 
-        # Handle the request
+        # Handle the request; agents are synchronous so keep them off the loop
         try:
-            request = TaskRequest(task_id=task_id, content=user_input)
-            response = agent.handle(request)
-            self._run(self.context_manager.update_status(task_id, "completed"))
+            context = None
+            if agent.uses_context:
+                with metrics.timer("context", task_id):
+                    context = (await self.context_builder.build(task_id, user_input)).render()
+            request = TaskRequest(task_id=task_id, content=user_input, context=context)
+            with metrics.timer("agent", task_id, agent=type(agent).__name__):
+                response = await asyncio.to_thread(agent.handle, request)
+            await self.context_manager.update_status(task_id, "completed")
             return response.content
         except Exception as e:
-            self._run(self.context_manager.update_status(task_id, "failed"))
+            await self.context_manager.update_status(task_id, "failed")
+            if raise_errors:
+                raise
             return f"Error: {str(e)}"
 
+    @staticmethod
+    def _error(message: str, raise_errors: bool) -> str:
+        if raise_errors:
+            raise TaskError(message)
+        return f"Error: {message}"
+
     def _select_agent(self, user_input: str) -> Optional[Any]:
         """Select the appropriate agent based on the user input."""
-        user_input = user_input.lower()
-
-        # Check for code-related keywords
-        code_keywords = ["explain", "analyze", "code", "function", "class", "method"]
-        if any(keyword in user_input for keyword in code_keywords):
-            return self.agents["code"]
-
-        # Check for file-related keywords
-        file_keywords = ["read", "write", "file", "content", "text"]
-        if any(keyword in user_input for keyword in file_keywords):
-            return self.agents["file"]
-
-        return None
+        return self.router.select(user_input)
 
     def list_tasks(self) -> str:
         """List all tasks and their status."""
@@ -93,19 +122,6 @@ class TaskOrchestrator:
 
     def summarize_task(self, task_id: str) -> str:
         """Generate a summary of a task's history."""
-        task = self._run(self.context_manager.get(task_id))
-        if not task:
-            return "Error: Task not found"
-
-        chunks = self._run(self.context_manager.get_chunks(task_id))
-        if not chunks:
-            return "No content found for this task"
-
-        # Use SLLM to generate a summary
-        content = "\n".join(chunk.content for chunk in chunks)
-        summary = self.model_selector.generate_response(
-            f"Summarize the following task history:\n\n{content}",
-            system_prompt="You are a helpful assistant that summarizes task histories."
+        return self._run(
+            summarize_task(self.context_manager, self.model_selector, task_id)
         )
-
-        return summary
@@ -0,0 +1,96 @@
+"""Semantic LLM response cache on top of a vector store."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import CACHE_REQUESTS, metrics
+
+
+def _fingerprint(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticCache:
+    """Answer near-duplicate prompts from previously generated responses.
+
+    Prompts are embedded by the vector store; a lookup returns the stored
+    response of the nearest prompt in the same namespace (and with the same
+    system prompt) when its similarity is at least ``threshold``. Namespaces
+    (typically a model id) can be invalidated independently.
+    """
+
+    def __init__(self, store: Any = None, threshold: float = 0.92, path: str = "chroma.db") -> None:
+        if store is None:
+            from .vector_store import ChromaVectorStore
+
+            store = ChromaVectorStore(path=path, collection="semantic_cache")
+        self.store = store
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, namespace: str, outcome: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+        metrics.inc(CACHE_REQUESTS, cache="semantic", result="hit" if outcome == "hits" else "miss")
+
+    @staticmethod
+    def _where(namespace: str, system_prompt: Optional[str]) -> Dict[str, Any]:
+        return {"$and": [{"namespace": namespace}, {"system": _fingerprint(system_prompt)}]}
+
+    def lookup(self, prompt: str, namespace: str = "default", system_prompt: Optional[str] = None) -> Optional[str]:
+        """Return the cached response of a similar prompt, or ``None``."""
+        matches = self.store.search(prompt, limit=1, where=self._where(namespace, system_prompt))
+        if matches and matches[0][1] >= self.threshold:
+            self._record(namespace, "hits")
+            return matches[0][2].get("response")
+        self._record(namespace, "misses")
+        return None
+
+    def store_response(
+        self, prompt: str, response: str, namespace: str = "default", system_prompt: Optional[str] = None
+    ) -> None:
+        metadata = {
+            "namespace": namespace,
+            "system": _fingerprint(system_prompt),
+            "response": response,
+        }
+        self.store.add(str(uuid.uuid4()), prompt, metadata)
+
+    def get_or_generate(
+        self,
+        prompt: str,
+        generate: Callable[[], str],
+        namespace: str = "default",
+        system_prompt: Optional[str] = None,
+    ) -> str:
+        """Return a semantically cached response or generate and store one."""
+        cached = self.lookup(prompt, namespace, system_prompt)
+        if cached is not None:
+            return cached
+        response = generate()
+        if response:
+            self.store_response(prompt, response, namespace, system_prompt)
+        return response
+
+    def invalidate(self, namespace: str) -> None:
+        """Forget every response cached under ``namespace``."""
+        self.store.delete(where={"namespace": namespace})
+        with self._lock:
+            self._stats.pop(namespace, None)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Hits, misses and hit rate per namespace."""
+        with self._lock:
+            return {
+                namespace: {
+                    **counters,
+                    "hit_rate": counters["hits"] / max(counters["hits"] + counters["misses"], 1),
+                }
+                for namespace, counters in self._stats.items()
+            }
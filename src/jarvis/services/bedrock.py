@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import boto3
 
 class BedrockClient:
     def __init__(self, region_name: str = "eu-central-1") -> None:  # Removed extra space
+        import boto3  # deferred: boto3 takes a noticeable time to import
+
         self.client = boto3.client("bedrock-runtime", region_name=region_name)
 
     def generate(self, prompt: str) -> str:
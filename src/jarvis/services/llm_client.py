@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 from functools import lru_cache
 
-from langchain_community.chat_models import BedrockChat
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-
 from .ollama import OllamaClient
 from .bedrock import BedrockClient
+from .resilience import Backend, CircuitBreaker, call_with_fallback
+from ..metrics import ERRORS, metrics, record_llm_call
+from ..response_cache import ResponseCache
+from ..semantic_cache import SemanticCache
+from ..tier_selector import TierSelector, get_tier_selector
+
+# LangChain is imported where it is used so importing this module stays cheap.
+if TYPE_CHECKING:
+    from langchain_community.chat_models import BedrockChat
 
 
 class LLMClient:
@@ -18,19 +24,67 @@ class LLMClient:
     @lru_cache(maxsize=1)
     def _initialize_bedrock() -> BedrockChat:
         """Initialize BedrockChat client with caching."""
+        from langchain_community.chat_models import BedrockChat
+
         return BedrockChat(
             model_id="anthropic.claude-3-5-sonnet-20240620-v1:0",
             region_name="us-east-1",
             model_kwargs={"temperature": 0.7, "max_tokens": 8000},
         )
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        tier_selector: Optional[TierSelector] = None,
+        ollama: Optional[Any] = None,
+        bedrock: Optional[Any] = None,
+        chat_model: Optional[Any] = None,
+        timeout: Optional[float] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_after: Optional[float] = None,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        max_workers: int = 16,
+    ) -> None:
+        """Create the client.
+
+        ``ollama``, ``bedrock`` and ``chat_model`` replace the default
+        backends (e.g. with fakes). Calls have no overall deadline by
+        default, since heavy generations can legitimately run for minutes;
+        ``timeout`` sets one in seconds and a per-call ``deadline`` overrides
+        it; the Ollama client's own connect and read timeouts still apply.
+        With ``hedge``, the legacy Bedrock client is also called once the
+        primary backend has been slower than its ``hedge_quantile`` latency
+        (or ``hedge_after`` seconds before enough calls were seen), and the
+        first answer wins.
+        A backend failing ``failure_threshold`` times in a row is not called
+        for ``recovery_timeout`` seconds.
+        """
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.tier_selector = tier_selector or get_tier_selector()
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_after = hedge_after
+        self.backends: Dict[str, Backend] = {
+            name: Backend(name, CircuitBreaker(failure_threshold, recovery_timeout))
+            for name in ("ollama", "langchain", "bedrock")
+        }
+        # Calls run on worker threads so a stalled backend can be abandoned.
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jarvis-llm")
+
         # Initialize legacy clients for backward compatibility
-        self.ollama = OllamaClient()
-        self.bedrock = BedrockClient()
+        self.ollama = ollama or OllamaClient()
+        self.bedrock = bedrock or BedrockClient()
 
         # Initialize LangChain models
-        self._init_langchain_models()
+        if chat_model is not None:
+            self.medium_model = self.heavy_model = chat_model
+        else:
+            self._init_langchain_models()
 
     def _init_langchain_models(self) -> None:
         """Initialize LangChain models with appropriate configurations."""
@@ -43,26 +97,92 @@ class LLMClient:
             print(f"Warning: Model initialization failed - {str(e)}")
             self.medium_model = self.heavy_model = None
 
-    def generate(self, model: str, prompt: str, system_prompt: Optional[str] = None) -> str:
-        """Generate text using the specified model with optional system prompt."""
+    def generate(
+        self,
+        model: str,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        task_type: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> str:
+        """Generate text using the specified model with optional system prompt.
+
+        With ``model="auto"`` the tier is picked by ``tier_selector`` from the
+        prompt, ``task_type`` and live per-tier latency and error rates. The
+        tier is resolved only on a cache miss, so cached answers are shared
+        across tiers. ``deadline`` overrides the client ``timeout`` in seconds.
+        """
+        def generate() -> str:
+            tier = self.tier_selector.choose(prompt, task_type, system_prompt) if model == "auto" else model
+            if self.semantic_cache is None:
+                return self._generate(tier, prompt, system_prompt, deadline)
+            return self.semantic_cache.get_or_generate(
+                prompt,
+                lambda: self._generate(tier, prompt, system_prompt, deadline),
+                namespace=model,
+                system_prompt=system_prompt,
+            )
+
+        if self.cache is None:
+            return generate()
+        return self.cache.get_or_generate(model, prompt, generate, system_prompt=system_prompt)
+
+    def _generate(
+        self, model: str, prompt: str, system_prompt: Optional[str] = None, deadline: Optional[float] = None
+    ) -> str:
+        calls: List[Tuple[Backend, Callable[[], str]]] = []
+        primary = self._primary(model, prompt, system_prompt)
+        if primary is None:
+            self.tier_selector.record(model, 0.0, ok=False)
+        else:
+            calls.append(primary)
+        # Fallback to legacy client
+        calls.append((self.backends["bedrock"], lambda: self.bedrock.generate(prompt)))
+
+        def on_outcome(backend: Backend, elapsed: float, ok: bool) -> None:
+            if primary is not None and backend is primary[0]:
+                self.tier_selector.record(model, elapsed, ok)
+            if not ok:
+                metrics.inc(ERRORS, stage="llm")
+
+        with metrics.timer("llm", model=model):
+            response = call_with_fallback(
+                self._executor,
+                calls,
+                deadline=deadline if deadline is not None else self.timeout,
+                hedge_delay=self._hedge_delay if self.hedge else None,
+                on_outcome=on_outcome,
+            )
+        record_llm_call(model, prompt, response)
+        return response
+
+    def _primary(
+        self, model: str, prompt: str, system_prompt: Optional[str]
+    ) -> Optional[Tuple[Backend, Callable[[], str]]]:
+        """The backend serving ``model`` and a call to it, if it is configured."""
+        if model == "local":
+            return self.backends["ollama"], lambda: self.ollama.generate(prompt)
+        if model in ("medium", "heavy") and self.medium_model:
+            return self.backends["langchain"], lambda: self._invoke_chat(prompt, system_prompt)
+        return None
+
+    def _invoke_chat(self, prompt: str, system_prompt: Optional[str]) -> str:
+        from langchain.schema import HumanMessage, SystemMessage
+
         messages = []
         if system_prompt:
             messages.append(SystemMessage(content=system_prompt))
         messages.append(HumanMessage(content=prompt))
+        response = self.medium_model.invoke(messages)
+        return response.content
 
-        try:
-            if model == "local":
-                return self.ollama.generate(prompt)
-            elif model in ("medium", "heavy") and self.medium_model:
-                response = self.medium_model.invoke(messages)
-                return response.content
-            else:
-                raise ValueError(f"Model {model} not available")
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        observed = backend.latency.percentile(self.hedge_quantile)
+        return observed if observed is not None else self.hedge_after
 
-        except Exception as e:
-            print(f"Warning: LangChain model failed - {str(e)}")
-            # Fallback to legacy client
-            return self.bedrock.generate(prompt)
+    def close(self) -> None:
+        """Release the worker threads; calls still running finish in the background."""
+        self._executor.shutdown(wait=False)
 
     def refresh_bedrock_client(self) -> None:
         """Force refresh the Bedrock client if needed."""
@@ -1,13 +1,84 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+import weakref
+from typing import Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 
 class OllamaClient:
-    def __init__(self, host: str = "http://localhost:11434") -> None:
+    """Client for a local Ollama server.
+
+    Requests go through one pooled keep-alive ``requests.Session`` so
+    repeated generations reuse TCP connections. Connect and read timeouts
+    bound every call, and connection errors and 502/503/504 responses are
+    retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        host: str = "http://localhost:11434",
+        model: str = "llama3",
+        connect_timeout: float = 3.0,
+        read_timeout: float = 120.0,
+        retries: int = 2,
+        backoff_factor: float = 0.5,
+        pool_size: int = 10,
+    ) -> None:
         self.host = host
+        self.model = model
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=False,  # a generation that timed out mid-read is not replayed
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=True
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
 
-    def generate(self, prompt: str) -> str:
-        resp = requests.post(f"{self.host}/api/generate", json={"prompt": prompt})
+    def generate(self, prompt: str, model: Optional[str] = None) -> str:
+        resp = self.session.post(
+            f"{self.host}/api/generate",
+            json={"model": model or self.model, "prompt": prompt, "stream": False},
+            timeout=self.timeout,
+        )
         resp.raise_for_status()
         data = resp.json()
         return data.get("response", "")
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop, so keep one per running loop.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.pool_size)
+            return semaphore
+
+    async def agenerate(self, prompt: str, model: Optional[str] = None) -> str:
+        """Async counterpart of :meth:`generate` sharing the same connection pool.
+
+        At most ``pool_size`` requests are in flight per event loop; the rest
+        wait without occupying a worker thread.
+        """
+        async with self._semaphore():
+            return await asyncio.to_thread(self.generate, prompt, model)
+
+    def close(self) -> None:
+        self.session.close()
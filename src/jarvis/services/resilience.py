@@ -0,0 +1,200 @@
+"""Deadlines, hedged calls and circuit breaking for model backends."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Callable, Deque, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every backend able to serve a call has an open circuit."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when no backend answered before the call's deadline."""
+
+
+class CircuitBreaker:
+    """Stop calling a backend after ``failure_threshold`` consecutive failures.
+
+    While open, calls are refused until ``recovery_timeout`` seconds have
+    passed; the circuit then lets ``half_open_calls`` trial calls through.
+    A successful trial closes it again, a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_calls: int = 1) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (reserves a trial when half open)."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trials = 0
+            if self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Latencies of the last ``window`` successful calls, for percentiles."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, minimum_samples: int = 20) -> Optional[float]:
+        """The ``q`` quantile, or ``None`` until enough calls were seen."""
+        with self._lock:
+            if len(self._samples) < minimum_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Backend:
+    """A named way to answer a call, with its own breaker and latency history."""
+
+    def __init__(self, name: str, breaker: Optional[CircuitBreaker] = None) -> None:
+        self.name = name
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+
+
+class _Attempt:
+    """One backend call; its outcome is recorded exactly once."""
+
+    def __init__(self, backend: Backend, future: Future, on_outcome: Optional[Callable[[Backend, float, bool], None]]):
+        self.backend = backend
+        self.future = future
+        self.started = time.monotonic()
+        self.on_outcome = on_outcome
+        self._recorded = False
+        self._lock = threading.Lock()
+        future.add_done_callback(self._done)
+
+    def _done(self, future: Future) -> None:
+        self.record(future.exception() is None)
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if self._recorded:
+                return
+            self._recorded = True
+        elapsed = time.monotonic() - self.started
+        if ok:
+            self.backend.breaker.record_success()
+            self.backend.latency.record(elapsed)
+        else:
+            self.backend.breaker.record_failure()
+        if self.on_outcome is not None:
+            self.on_outcome(self.backend, elapsed, ok)
+
+
+def call_with_fallback(
+    executor: Executor,
+    calls: Sequence[Tuple[Backend, Callable[[], T]]],
+    deadline: Optional[float] = None,
+    hedge_delay: Optional[Callable[[Backend], Optional[float]]] = None,
+    on_outcome: Optional[Callable[[Backend, float, bool], None]] = None,
+) -> T:
+    """Return the first successful result of ``calls``, tried in order.
+
+    Backends whose circuit is open are skipped. The next backend starts when
+    the current one fails or, if ``hedge_delay`` returns a delay for it, once
+    that delay passes without an answer (a hedged request); whichever call
+    succeeds first wins. ``deadline`` bounds the whole call in seconds. A call
+    still running at the deadline is counted as a failure of its backend and
+    left to finish in the background.
+    """
+    end = None if deadline is None else time.monotonic() + deadline
+    pending = [(backend, fn) for backend, fn in calls]
+    running: List[_Attempt] = []
+    errors: List[BaseException] = []
+    refused = 0
+
+    def launch_next() -> None:
+        nonlocal refused
+        while pending:
+            backend, fn = pending.pop(0)
+            if backend.breaker.allow():
+                running.append(_Attempt(backend, executor.submit(fn), on_outcome))
+                return
+            refused += 1
+
+    launch_next()
+    while running:
+        remaining = None if end is None else end - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            break
+        # Wait for an answer, or until the newest attempt should be hedged.
+        delay = hedge_delay(running[-1].backend) if hedge_delay and pending else None
+        if delay is not None:
+            delay = max(delay - (time.monotonic() - running[-1].started), 0.0)
+        timeout = min((t for t in (remaining, delay) if t is not None), default=None)
+        done, _ = wait([a.future for a in running], timeout=timeout, return_when=FIRST_COMPLETED)
+        for attempt in [a for a in running if a.future in done]:
+            running.remove(attempt)
+            error = attempt.future.exception()
+            if error is None:
+                return attempt.future.result()
+            errors.append(error)
+        if done:
+            if not running:
+                launch_next()
+        elif delay is not None and (remaining is None or delay < remaining):
+            launch_next()
+
+    for attempt in running:
+        attempt.record(ok=False)
+    if running:
+        raise DeadlineExceeded(f"No backend answered within {deadline:.1f}s")
+    if errors:
+        raise errors[-1]
+    if refused:
+        raise CircuitOpenError("Circuit open for every available backend")
+    raise RuntimeError("No backend to call")
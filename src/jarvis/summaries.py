@@ -0,0 +1,72 @@
+"""Incremental rolling summaries of task history."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Iterator, List
+
+from .context_manager import ContextManager
+from .db import Chunk
+from .model_selector import ModelSelector
+from .utils.chunker import chunk_text
+
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes task histories."
+
+# Upper bound on the new history sent to the model in one call, so each
+# prompt stays within the model's context window.
+MAX_INPUT_CHARS = 8000
+
+
+def _batches(chunks: List[Chunk], max_chars: int) -> Iterator[str]:
+    """Group chunk contents into pieces of at most ``max_chars`` characters."""
+    batch: List[str] = []
+    size = 0
+    for chunk in chunks:
+        for piece in chunk_text(chunk.content or "", max_chars) or [""]:
+            if batch and size + len(piece) > max_chars:
+                yield "\n".join(batch)
+                batch, size = [], 0
+            batch.append(piece)
+            size += len(piece) + 1
+    if batch:
+        yield "\n".join(batch)
+
+
+def _fold(model_selector: ModelSelector, summary: str | None, content: str) -> str:
+    if summary is None:
+        prompt = f"Summarize the following task history:\n\n{content}"
+    else:
+        prompt = (
+            "Update the summary below so it also covers the new task history.\n\n"
+            f"Current summary:\n{summary}\n\nNew task history:\n{content}"
+        )
+    return model_selector.generate_response(prompt, system_prompt=SYSTEM_PROMPT)
+
+
+async def summarize_task(
+    context_manager: ContextManager,
+    model_selector: ModelSelector,
+    task_id: str,
+    max_chars: int = MAX_INPUT_CHARS,
+) -> str:
+    """Return an up-to-date summary of a task, folding in only new chunks.
+
+    The stored summary remembers the last chunk it covered, so repeated
+    calls cost O(new content) rather than O(all history).
+    """
+    if await context_manager.get_task(task_id) is None:
+        return "Error: Task not found"
+
+    latest = await context_manager.get_latest_summary(task_id)
+    after_id = latest.last_chunk_id if latest else None
+    chunks = await context_manager.get_chunks(task_id, after_id=after_id)
+    if not chunks:
+        return latest.content if latest else "No content found for this task"
+
+    summary = latest.content if latest else None
+    for content in _batches(chunks, max_chars):
+        # Model calls block; keep them off the shared event loop.
+        summary = await asyncio.to_thread(_fold, model_selector, summary, content)
+
+    await context_manager.add_summary(task_id, summary, last_chunk_id=chunks[-1].id)
+    return summary
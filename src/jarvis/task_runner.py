@@ -1,26 +1,237 @@
 from __future__ import annotations
 
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
 from .context_manager import ContextManager
-from .orchestrator import MultiContextPlanner
+from .db import is_memory_url
+from .orchestrator import TaskOrchestrator
+from .utils.loop import LoopRunner, get_runner
+
+MODES = ("asyncio", "thread", "process")
+
+# Per-process orchestrator used by process-mode workers.
+_process_orchestrator: Optional[TaskOrchestrator] = None
+
+
+def _handle_in_process(db_url: str, task_id: str, prompt: str) -> str:
+    """Process-pool entry point; each worker process keeps its own orchestrator."""
+    global _process_orchestrator
+    if _process_orchestrator is None:
+        _process_orchestrator = TaskOrchestrator(ContextManager(db_url))
+    return _process_orchestrator.handle(task_id, prompt)
+
+
+@dataclass
+class RunStats:
+    """Outcome of a :meth:`TaskRunner.run` call."""
+
+    completed: int = 0
+    failed: int = 0
+    lost_leases: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.failed
+
+    @property
+    def throughput(self) -> float:
+        """Tasks finished per second."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class _Lease:
+    token: str
+    started: float = field(default_factory=time.monotonic)
+
+
+class TaskRunner:
+    """Process pending tasks with a pool of concurrent workers.
 
+    Tasks are claimed from the database with expiring leases, so several
+    runners (on one machine or many, sharing one database) never pick up the
+    same task. While a task is in flight its lease is renewed every
+    ``lease_seconds / 3`` seconds; if a runner dies, its leases expire and the
+    tasks are picked up again by whichever runner claims next. A task whose
+    lease has expired ``max_attempts`` times is marked failed.
 
-def run_pending() -> None:
+    ``mode`` selects how handlers run: ``asyncio`` awaits
+    :meth:`TaskOrchestrator.ahandle` on one loop, ``thread`` calls the
+    blocking :meth:`TaskOrchestrator.handle` from a thread pool and
+    ``process`` runs each task in a process pool with its own orchestrator
+    (file databases only).
+    """
+
+    def __init__(
+        self,
+        context_manager: ContextManager,
+        orchestrator: Optional[TaskOrchestrator] = None,
+        concurrency: int = 4,
+        mode: str = "asyncio",
+        lease_seconds: float = 30.0,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None,
+        runner: Optional[LoopRunner] = None,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}; expected one of {', '.join(MODES)}")
+        if mode == "process" and is_memory_url(context_manager.db_url):
+            raise ValueError("Process mode needs a file database shared between processes")
+        self.context_manager = context_manager
+        self.orchestrator = orchestrator or TaskOrchestrator(context_manager)
+        self.concurrency = concurrency
+        self.mode = mode
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.runner = runner or get_runner()
+        self._leases: Dict[str, _Lease] = {}
+        self._stop: Optional[asyncio.Event] = None
+
+    def run(self, drain: bool = True) -> RunStats:
+        """Process tasks until none are left (``drain``) or :meth:`stop` is called."""
+        return self.runner.run(self.arun(drain))
+
+    def stop(self) -> None:
+        """Ask a running :meth:`run` to finish its in-flight tasks and return."""
+        if self._stop is not None:
+            self.runner.loop.call_soon_threadsafe(self._stop.set)
+
+    async def arun(self, drain: bool = True) -> RunStats:
+        """Async counterpart of :meth:`run`."""
+        stats = RunStats()
+        started = time.monotonic()
+        self._stop = asyncio.Event()
+        executor = self._make_executor()
+        in_flight: set[asyncio.Task] = set()
+        heartbeat = asyncio.ensure_future(self._heartbeat())
+        try:
+            while not self._stop.is_set():
+                free = self.concurrency - len(in_flight)
+                claimed = []
+                if free > 0:
+                    claimed = await self.context_manager.claim_tasks(
+                        self.worker_id, free, self.lease_seconds, self.max_attempts
+                    )
+                for task in claimed:
+                    self._leases[task.id] = _Lease(task.lease_owner)
+                    in_flight.add(asyncio.ensure_future(self._process(executor, task.id, task.prompt, stats)))
+                if not in_flight:
+                    if drain:
+                        break
+                    await self._sleep(self.poll_interval)
+                    continue
+                # Wake on the first finished task so freed slots are refilled quickly.
+                await asyncio.wait(
+                    in_flight,
+                    timeout=None if len(claimed) >= free else self.poll_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                in_flight = {t for t in in_flight if not t.done()}
+            if in_flight:
+                await asyncio.wait(in_flight)
+        finally:
+            heartbeat.cancel()
+            if executor is not None:
+                executor.shutdown(wait=True)
+        stats.elapsed = time.monotonic() - started
+        return stats
+
+    async def _sleep(self, seconds: float) -> None:
+        assert self._stop is not None
+        try:
+            await asyncio.wait_for(self._stop.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def _make_executor(self) -> Optional[Executor]:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="jarvis-task")
+        if self.mode == "process":
+            # Forking would copy the DB and event-loop threads' locks mid-use.
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency, mp_context=multiprocessing.get_context("spawn")
+            )
+        return None
+
+    async def _execute(self, executor: Optional[Executor], task_id: str, prompt: str) -> str:
+        if self.mode == "asyncio":
+            return await self.orchestrator.ahandle(task_id, prompt)
+        loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            return await loop.run_in_executor(executor, self.orchestrator.handle, task_id, prompt)
+        return await loop.run_in_executor(
+            executor, _handle_in_process, self.context_manager.db_url, task_id, prompt
+        )
+
+    async def _process(self, executor: Optional[Executor], task_id: str, prompt: str, stats: RunStats) -> None:
+        lease = self._leases[task_id]
+        print(f"Processing {task_id}: {prompt}")
+        try:
+            result = await self._execute(executor, task_id, prompt)
+            # The orchestrator reports problems as "Error: ..." strings.
+            status = "failed" if result.startswith("Error:") else "completed"
+        except Exception as e:
+            print(f"Task {task_id} failed: {e}")
+            status = "failed"
+        finally:
+            self._leases.pop(task_id, None)
+        if not await self.context_manager.release_task(task_id, lease.token, status):
+            stats.lost_leases += 1
+        if status == "completed":
+            stats.completed += 1
+        else:
+            stats.failed += 1
+
+    async def _heartbeat(self) -> None:
+        interval = self.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            leases: list[Tuple[str, str]] = [(task_id, lease.token) for task_id, lease in self._leases.items()]
+            if leases:
+                await self.context_manager.renew_leases(leases, self.lease_seconds)
+
+
+def run_pending(
+    concurrency: int = 4,
+    mode: str = "asyncio",
+    lease_seconds: float = 30.0,
+    drain: bool = True,
+) -> RunStats:
     cm = ContextManager()
-    planner = MultiContextPlanner()
-    planner.context_manager = cm
-
-    tasks = cm.list_tasks(status="pending")
-    for task in tasks:
-        print(f"Processing {task.id}: {task.prompt}")
-        # TODO: The user_input for planner.handle should be based on the next action for the task,
-        # not just the initial prompt. This needs further refinement based on agent communication.
-        planner.handle(task.id, task.prompt)
-    remaining = cm.list_tasks(status="pending")
-    if not remaining:
-        print("All tasks completed.")
-    else:
-        print(f"{len(remaining)} tasks left.")
+    runner = TaskRunner(cm, concurrency=concurrency, mode=mode, lease_seconds=lease_seconds)
+    try:
+        stats = runner.run(drain=drain)
+    finally:
+        cm.close()
+    print(
+        f"Processed {stats.processed} tasks ({stats.completed} completed, {stats.failed} failed) "
+        f"in {stats.elapsed:.2f}s, {stats.throughput:.1f} tasks/s."
+    )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process pending Jarvis tasks.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tasks processed at once")
+    parser.add_argument("--mode", choices=MODES, default="asyncio", help="How task handlers run")
+    parser.add_argument("--lease", type=float, default=30.0, help="Lease duration in seconds")
+    parser.add_argument("--forever", action="store_true", help="Keep polling for new tasks")
+    args = parser.parse_args()
+    run_pending(args.concurrency, args.mode, args.lease, drain=not args.forever)
 
 
 if __name__ == "__main__":
-    run_pending()
+    main()
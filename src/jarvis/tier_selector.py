@@ -0,0 +1,154 @@
+"""Adaptive choice between the local, medium and heavy model tiers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from .utils.chunker import count_tokens
+
+TIERS = ("local", "medium", "heavy")
+
+# Lowest tier that is good enough for each kind of task.
+TASK_TIERS: Dict[str, str] = {
+    "chat": "local",
+    "summarize": "local",
+    "read": "local",
+    "explain": "medium",
+    "analyze": "medium",
+    "code": "medium",
+    "refactor": "heavy",
+    "plan": "heavy",
+}
+
+
+@dataclass
+class TierStats:
+    latency: Optional[float] = None  # EWMA of successful call latency, seconds
+    error_rate: float = 0.0  # EWMA of failures (1) and successes (0)
+    calls: int = 0
+    errors: int = 0
+    last_error: float = 0.0
+
+
+class TierSelector:
+    """Pick the cheapest model tier that suits a prompt and is healthy.
+
+    A prompt's minimum tier comes from its size (``count_tokens`` of prompt
+    and system prompt against ``local_max_tokens`` and
+    ``medium_max_tokens``) and its task type (:data:`TASK_TIERS`, inferred
+    from the first word of the prompt when not given).
+
+    Every call outcome is folded into per-tier EWMAs of latency and error
+    rate. A tier whose error rate is above ``max_error_rate`` is skipped for
+    ``cooldown`` seconds after its last failure, and a tier slower than its
+    ``latency_slo`` is skipped when a higher healthy tier is currently
+    faster. Selection escalates to the next higher tier, and only falls
+    back to a lower one when nothing above is usable.
+    """
+
+    def __init__(
+        self,
+        tiers: Sequence[str] = TIERS,
+        alpha: float = 0.2,
+        local_max_tokens: int = 400,
+        medium_max_tokens: int = 3000,
+        max_error_rate: float = 0.3,
+        cooldown: float = 30.0,
+        latency_slo: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.tiers = tuple(tiers)
+        self.alpha = alpha
+        self.local_max_tokens = local_max_tokens
+        self.medium_max_tokens = medium_max_tokens
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.latency_slo = latency_slo or {"local": 5.0, "medium": 20.0, "heavy": 60.0}
+        self._stats: Dict[str, TierStats] = {tier: TierStats() for tier in self.tiers}
+        self._lock = threading.Lock()
+
+    def minimum_tier(self, prompt: str, task_type: Optional[str] = None, system_prompt: Optional[str] = None) -> str:
+        """Cheapest tier suitable for the prompt, ignoring live statistics."""
+        tokens = count_tokens(prompt) + (count_tokens(system_prompt) if system_prompt else 0)
+        if tokens > self.medium_max_tokens:
+            by_size = "heavy"
+        elif tokens > self.local_max_tokens:
+            by_size = "medium"
+        else:
+            by_size = "local"
+        if task_type is None:
+            words = prompt.split(maxsplit=1)
+            task_type = words[0].lower() if words else "chat"
+        by_task = TASK_TIERS.get(task_type, "local")
+        return max(by_size, by_task, key=self._rank)
+
+    def _rank(self, tier: str) -> int:
+        return self.tiers.index(tier) if tier in self.tiers else len(self.tiers) - 1
+
+    def _healthy(self, tier: str, now: float) -> bool:
+        stats = self._stats[tier]
+        # After the cooldown a failing tier gets another chance (a probe).
+        return stats.error_rate <= self.max_error_rate or now - stats.last_error >= self.cooldown
+
+    def _too_slow(self, tier: str) -> bool:
+        latency = self._stats[tier].latency
+        return latency is not None and latency > self.latency_slo.get(tier, float("inf"))
+
+    def choose(self, prompt: str, task_type: Optional[str] = None, system_prompt: Optional[str] = None) -> str:
+        """Return the tier that should serve ``prompt``."""
+        start = self._rank(self.minimum_tier(prompt, task_type, system_prompt))
+        now = time.monotonic()
+        with self._lock:
+            higher = [t for t in self.tiers[start:] if self._healthy(t, now)]
+            if higher:
+                choice = higher[0]
+                if self._too_slow(choice):
+                    faster = [
+                        t
+                        for t in higher[1:]
+                        if self._stats[t].latency is not None and self._stats[t].latency < self._stats[choice].latency
+                    ]
+                    if faster:
+                        choice = faster[0]
+                return choice
+            lower = [t for t in reversed(self.tiers[:start]) if self._healthy(t, now)]
+            return lower[0] if lower else self.tiers[start]
+
+    def record(self, tier: str, latency: float, ok: bool = True) -> None:
+        """Fold the outcome of one call to ``tier`` into its statistics."""
+        with self._lock:
+            stats = self._stats.setdefault(tier, TierStats())
+            stats.calls += 1
+            stats.error_rate += self.alpha * ((0.0 if ok else 1.0) - stats.error_rate)
+            if ok:
+                stats.latency = latency if stats.latency is None else stats.latency + self.alpha * (latency - stats.latency)
+            else:
+                stats.errors += 1
+                stats.last_error = time.monotonic()
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        with self._lock:
+            return {
+                tier: {
+                    "latency": s.latency,
+                    "error_rate": s.error_rate,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                }
+                for tier, s in self._stats.items()
+            }
+
+
+_default_selector: Optional[TierSelector] = None
+_default_lock = threading.Lock()
+
+
+def get_tier_selector() -> TierSelector:
+    """Return the process-wide shared :class:`TierSelector`."""
+    global _default_selector
+    with _default_lock:
+        if _default_selector is None:
+            _default_selector = TierSelector()
+        return _default_selector
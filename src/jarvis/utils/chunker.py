@@ -1,5 +1,176 @@
 from __future__ import annotations
 
+import codecs
+import mmap
+import os
+import re
+from typing import IO, Callable, Iterator, List, Optional, Union
+
+# Each pattern matches the delimiter that ends a segment; the delimiter stays
+# with the preceding segment so ``"".join(chunks)`` reproduces the input when
+# no overlap is requested.
+BOUNDARIES = {
+    "line": re.compile(r"\n"),
+    "paragraph": re.compile(r"\n[ \t]*\n\s*"),
+    "sentence": re.compile(r"(?<=[.!?])\s+|\n"),
+}
+
+_WORD = re.compile(r"\S+\s*|\s+")
+
+READ_SIZE = 64 * 1024
+
+Source = Union[str, IO[str], IO[bytes], mmap.mmap]
+
+
 def chunk_text(text: str, size: int = 1024) -> list[str]:
     """Split text into roughly size-byte chunks."""
     return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def count_tokens(text: str) -> int:
+    """Cheap token estimate: the number of whitespace-separated words."""
+    return len(text.split())
+
+
+def _hard_split(text: str, size: int, measure: Callable[[str], int], by_chars: bool) -> Iterator[str]:
+    """Split a segment that is larger than ``size`` on its own."""
+    if by_chars:
+        for i in range(0, len(text), size):
+            yield text[i : i + size]
+        return
+    piece: List[str] = []
+    used = 0
+    for word in _WORD.findall(text):
+        cost = measure(word)
+        if piece and used + cost > size:
+            yield "".join(piece)
+            piece, used = [], 0
+        piece.append(word)
+        used += cost
+    if piece:
+        yield "".join(piece)
+
+
+def _read_text(source: Source, encoding: str, read_size: int) -> Iterator[str]:
+    """Yield decoded text blocks from a string, text/binary file or mmap."""
+    if isinstance(source, str):
+        for i in range(0, len(source), read_size):
+            yield source[i : i + read_size]
+        return
+    decoder = None
+    while True:
+        block = source.read(read_size)
+        if not block:
+            break
+        if isinstance(block, (bytes, bytearray)):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            block = decoder.decode(block)
+        if block:
+            yield block
+    if decoder is not None:
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def iter_chunks(
+    source: Source,
+    size: int = 1024,
+    overlap: int = 0,
+    boundary: Optional[str] = "line",
+    unit: str = "chars",
+    tokenizer: Optional[Callable[[str], int]] = None,
+    encoding: str = "utf-8",
+    read_size: int = READ_SIZE,
+) -> Iterator[str]:
+    """Lazily chunk ``source`` without materialising it in memory.
+
+    ``source`` may be a string, a text or binary file object, or an mmap.
+    Chunks are cut on ``boundary`` ("line", "paragraph", "sentence" or
+    ``None`` for hard cuts) and hold at most ``size`` units, where ``unit`` is
+    "chars" or "tokens" (counted with ``tokenizer``). A segment longer than
+    ``size`` is split hard. Each chunk after the first starts with up to
+    ``overlap`` units carried over from the end of the previous one.
+    """
+    if size <= 0:
+        raise ValueError("size must be positive")
+    if not 0 <= overlap < size:
+        raise ValueError("overlap must be between 0 and size - 1")
+    if unit not in ("chars", "tokens"):
+        raise ValueError(f"Unknown chunk unit: {unit}")
+    if boundary is not None and boundary not in BOUNDARIES:
+        raise ValueError(f"Unknown chunk boundary: {boundary}")
+
+    by_chars = unit == "chars"
+    measure: Callable[[str], int] = len if by_chars else (tokenizer or count_tokens)
+    pattern = BOUNDARIES[boundary] if boundary else None
+    # Text without a boundary is forced out as a segment once it grows past
+    # this many characters, which bounds memory on e.g. giant single lines.
+    max_pending = max(read_size, size if by_chars else 0)
+
+    current: List[str] = []
+    costs: List[int] = []
+    used = 0
+
+    def add(segment: str) -> Iterator[str]:
+        nonlocal current, costs, used
+        cost = measure(segment)
+        if cost > size:
+            for piece in _hard_split(segment, size, measure, by_chars):
+                yield from add(piece)
+            return
+        if current and used + cost > size:
+            yield "".join(current)
+            # Carry trailing segments forward as the overlap window.
+            keep = 0
+            carried = 0
+            for seg_cost in reversed(costs if overlap else []):
+                if carried + seg_cost > overlap or carried + seg_cost + cost > size:
+                    break
+                carried += seg_cost
+                keep += 1
+            current = current[len(current) - keep :] if keep else []
+            costs = costs[len(costs) - keep :] if keep else []
+            used = carried
+        current.append(segment)
+        costs.append(cost)
+        used += cost
+
+    pending = ""
+    for block in _read_text(source, encoding, read_size):
+        pending += block
+        if pattern is None:
+            segments, pending = [pending], ""
+        else:
+            segments = []
+            start = 0
+            for match in pattern.finditer(pending):
+                segments.append(pending[start : match.end()])
+                start = match.end()
+            pending = pending[start:]
+            if len(pending) > max_pending:
+                segments.append(pending)
+                pending = ""
+        for segment in segments:
+            yield from add(segment)
+    if pending:
+        yield from add(pending)
+    if current:
+        yield "".join(current)
+
+
+def iter_file_chunks(
+    path: Union[str, os.PathLike],
+    size: int = 1024,
+    use_mmap: bool = False,
+    encoding: str = "utf-8",
+    **kwargs,
+) -> Iterator[str]:
+    """Chunk a file incrementally; see :func:`iter_chunks` for options."""
+    with open(path, "rb") as handle:
+        if use_mmap and os.fstat(handle.fileno()).st_size:
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from iter_chunks(mapped, size, encoding=encoding, **kwargs)
+        else:
+            yield from iter_chunks(handle, size, encoding=encoding, **kwargs)
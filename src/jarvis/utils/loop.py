@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopRunner:
+    """Run coroutines from synchronous code on one long-lived event loop.
+
+    The loop lives on a daemon thread, so sync callers never pay for creating
+    and tearing down a loop per call (as ``asyncio.run`` does) and the same
+    runner can be used whether or not the caller already has a loop running.
+    """
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="jarvis-loop", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Execute ``coro`` on the runner's loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self) -> None:
+        """Stop the loop and join its thread."""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_default_runner: Optional[LoopRunner] = None
+_default_lock = threading.Lock()
+
+
+def get_runner() -> LoopRunner:
+    """Return the process-wide shared :class:`LoopRunner`."""
+    global _default_runner
+    with _default_lock:
+        if _default_runner is None:
+            _default_runner = LoopRunner()
+        return _default_runner
@@ -1,17 +1,176 @@
 from __future__ import annotations
 
-import chromadb
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-class ChromaVectorStore:
+# (id, similarity, metadata) as returned by ``VectorStore.search``.
+SearchResult = Tuple[str, float, Dict[str, Any]]
+
+
+class VectorStore(ABC):
+    """Interface shared by the vector store backends.
+
+    Similarities are cosine similarities in ``[-1, 1]`` (higher is closer).
+    ``where`` filters use Chroma's syntax: ``{"key": value}``,
+    ``{"key": {"$eq": value}}`` and ``{"$and": [...]}`` / ``{"$or": [...]}``.
+    """
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        self.add_many([doc_id], [text], [metadata] if metadata else None)
+
+    @abstractmethod
+    def add_many(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        """Add several documents in one call."""
+
+    def query(self, text: str, limit: int = 5) -> list[str]:
+        """Return the texts of the nearest documents."""
+        return [self.get_document(doc_id) for doc_id, _, _ in self.search(text, limit)]
+
+    def search(
+        self, text: str, limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[SearchResult]:
+        """Return ``(id, similarity, metadata)`` for the nearest documents."""
+        return self.search_many([text], limit, where)[0]
+
+    @abstractmethod
+    def search_many(
+        self, texts: Sequence[str], limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[SearchResult]]:
+        """Batched :meth:`search`, one result list per query text."""
+
+    @abstractmethod
+    def get_document(self, doc_id: str) -> str:
+        """Return the stored text of ``doc_id``."""
+
+    @abstractmethod
+    def delete(self, where: Optional[Dict[str, Any]] = None, ids: Optional[List[str]] = None) -> None:
+        """Remove documents by id and/or metadata filter."""
+
+    def persist(self) -> None:
+        """Flush state to disk for backends that keep it in memory."""
+
+
+class ChromaVectorStore(VectorStore):
     """Minimal wrapper around Chroma vector store."""
 
-    def __init__(self, path: str = "chroma.db") -> None:
+    migrate_batch = 1000
+
+    def __init__(self, path: str = "chroma.db", collection: str = "chunks") -> None:
+        import chromadb
+
         self.client = chromadb.PersistentClient(path=path)
-        self.collection = self.client.get_or_create_collection("chunks")
+        # Cosine distance so search scores map onto a 0..1 similarity.
+        self.collection = self._open_cosine(collection)
+
+    def _get_collection(self, name: str) -> Any:
+        try:
+            return self.client.get_collection(name)
+        except Exception:  # missing collections raise different types across versions
+            return None
+
+    def _open_cosine(self, name: str) -> Any:
+        """Open ``name``, migrating it to cosine distance if it uses another space.
+
+        Chroma fixes a collection's distance function when it is created and
+        ``get_or_create_collection`` ignores the requested space for existing
+        collections, so ones created with the default squared L2 would make
+        ``1 - distance`` meaningless. Their rows, stored embeddings included,
+        are copied into a cosine collection that then takes over the name.
+        """
+        staging_name = f"{name}__cosine"
+        staging = self._get_collection(staging_name)
+        current = self._get_collection(name)
+        if staging is not None:
+            if current is None:
+                # Interrupted after the old collection was dropped.
+                staging.modify(name=name)
+                return staging
+            self.client.delete_collection(staging_name)
+        if current is None:
+            return self.client.create_collection(name, metadata={"hnsw:space": "cosine"})
+        metadata = dict(current.metadata or {})
+        if metadata.get("hnsw:space", "l2") == "cosine":
+            return current
+
+        metadata["hnsw:space"] = "cosine"
+        staging = self.client.create_collection(staging_name, metadata=metadata)
+        offset = 0
+        while True:
+            rows = current.get(
+                limit=self.migrate_batch, offset=offset, include=["embeddings", "documents", "metadatas"]
+            )
+            if not rows["ids"]:
+                break
+            # Chroma rejects empty metadata, so rows without any go in separately.
+            metadatas = rows["metadatas"] or [None] * len(rows["ids"])
+            for with_metadata in (True, False):
+                picked = [n for n, m in enumerate(metadatas) if bool(m) == with_metadata]
+                if picked:
+                    staging.add(
+                        ids=[rows["ids"][n] for n in picked],
+                        embeddings=[rows["embeddings"][n] for n in picked],
+                        documents=[rows["documents"][n] for n in picked],
+                        metadatas=[metadatas[n] for n in picked] if with_metadata else None,
+                    )
+            offset += len(rows["ids"])
+        self.client.delete_collection(name)
+        staging.modify(name=name)
+        return staging
 
-    def add(self, doc_id: str, text: str) -> None:
-        self.collection.add(documents=[text], ids=[doc_id])
+    def add_many(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        self.collection.add(
+            documents=list(texts), ids=list(ids), metadatas=list(metadatas) if metadatas else None
+        )
 
     def query(self, text: str, limit: int = 5) -> list[str]:
         res = self.collection.query(query_texts=[text], n_results=limit)
         return [doc for doc in res.get("documents", [[]])[0]]
+
+    def search_many(
+        self, texts: Sequence[str], limit: int = 5, where: Optional[Dict[str, Any]] = None
+    ) -> List[List[SearchResult]]:
+        res = self.collection.query(
+            query_texts=list(texts), n_results=limit, where=where, include=["distances", "metadatas"]
+        )
+        results = []
+        for ids, distances, metadatas in zip(
+            res.get("ids", []), res.get("distances") or [], res.get("metadatas") or []
+        ):
+            results.append(
+                [
+                    (doc_id, 1.0 - distance, metadata or {})
+                    for doc_id, distance, metadata in zip(ids, distances, metadatas)
+                ]
+            )
+        return results or [[] for _ in texts]
+
+    def get_document(self, doc_id: str) -> str:
+        res = self.collection.get(ids=[doc_id], include=["documents"])
+        docs = res.get("documents") or []
+        if not docs:
+            raise KeyError(doc_id)
+        return docs[0]
+
+    def delete(self, where: Optional[Dict[str, Any]] = None, ids: Optional[List[str]] = None) -> None:
+        self.collection.delete(ids=ids, where=where)
+
+
+def get_vector_store(backend: str = "chroma", **kwargs: Any) -> VectorStore:
+    """Create a vector store backend by name ("chroma" or "numpy")."""
+    if backend == "chroma":
+        return ChromaVectorStore(**kwargs)
+    if backend == "numpy":
+        from .numpy_store import NumpyVectorStore
+
+        return NumpyVectorStore(**kwargs)
+    raise ValueError(f"Unknown vector store backend: {backend}")
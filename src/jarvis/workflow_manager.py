@@ -6,48 +6,75 @@ import asyncio
 import uuid
 from typing import Optional, Dict, Any
 
-from .context_manager import ContextManager
+from .context_manager import ContextManager, UnitOfWork
+from .metrics import metrics
 from .model_selector import ModelSelector
-from .agents.code import CodeAgent
-from .agents.file import FileAgent
+from .response_cache import ResponseCache
 from .agents.base import TaskRequest
+from .agents.registry import AgentRegistry, AgentRouter
+from .summaries import summarize_task
+from .utils.loop import LoopRunner, get_runner
 
 
 class WorkflowManager:
     """Simple manager that routes commands to the appropriate agent."""
 
-    def __init__(self, context_manager: ContextManager, model_config: Optional[Dict[str, Any]] = None) -> None:
+    def __init__(
+        self,
+        context_manager: ContextManager,
+        model_config: Optional[Dict[str, Any]] = None,
+        runner: Optional[LoopRunner] = None,
+        response_cache: Optional[ResponseCache] = None,
+        registry: Optional[AgentRegistry] = None,
+    ) -> None:
         self.context_manager = context_manager
-        self.model_selector = ModelSelector(model_type="sllm", model_config=model_config)
-        self.agents = {
-            "code": CodeAgent(context_manager, self.model_selector),
-            "file": FileAgent(context_manager, self.model_selector),
-        }
+        self.runner = runner or get_runner()
+        self.model_selector = ModelSelector(
+            model_type="sllm", model_config=model_config, cache=response_cache
+        )
+        self.router = AgentRouter(context_manager, self.model_selector, registry)
 
     def _run(self, coro):
-        """Utility to execute an async coroutine."""
-        return asyncio.run(coro)
+        """Execute a coroutine on the shared long-lived event loop."""
+        return self.runner.run(coro)
 
     def execute_workflow(self, user_input: str) -> str:
         """Execute a single user request through the agent workflow."""
+        return self._run(self.aexecute_workflow(user_input))
+
+    async def aexecute_workflow(self, user_input: str) -> str:
+        """Async counterpart of :meth:`execute_workflow`."""
         task_id = str(uuid.uuid4())
-        self._run(self.context_manager.create_task(task_id, user_input))
+        # Each request is one transaction: the task is written together with
+        # its response and final status, or with "failed" if the agent raises.
+        uow = UnitOfWork()
+        uow.create_task(task_id, user_input)
 
-        agent = self._select_agent(user_input)
+        with metrics.timer("route", task_id):
+            agent = self._select_agent(user_input)
         if agent is None:
+            await self.context_manager.commit(uow)
             return "No suitable agent found for this request"
 
         request = TaskRequest(task_id=task_id, content=user_input)
-        response = agent.handle(request)
-        self._run(self.context_manager.add_chunk(task_id, response.content))
-        self._run(self.context_manager.update_status(task_id, "completed"))
+        try:
+            with metrics.timer("agent", task_id, agent=type(agent).__name__):
+                response = await asyncio.to_thread(agent.handle, request)
+        except Exception:
+            uow.update_status(task_id, "failed")
+            await self.context_manager.commit(uow)
+            raise
+        uow.add_chunk(task_id, response.content)
+        uow.update_status(task_id, "completed")
+        await self.context_manager.commit(uow)
         return response.content
 
+    def summarize_task(self, task_id: str) -> str:
+        """Return the rolling summary of a task, updated with new history."""
+        return self._run(
+            summarize_task(self.context_manager, self.model_selector, task_id)
+        )
+
     def _select_agent(self, user_input: str):
-        """Heuristically choose the best agent for the request."""
-        lower = user_input.lower()
-        if any(k in lower for k in ["explain", "analyze", "code", "function", "class", "method"]):
-            return self.agents["code"]
-        if any(k in lower for k in ["read", "write", "file", "content", "text"]):
-            return self.agents["file"]
-        return None
+        """Choose the agent registered for the request's keywords."""
+        return self.router.select(user_input)
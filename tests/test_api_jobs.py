@@ -0,0 +1,51 @@
+"""Background jobs of the API end in the state of the work they ran."""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # The module opens ./jarvis.db when imported.
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("src.jarvis.api.main")
+
+
+async def _run_job(api, task_id: str, content: str) -> dict:
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(f"/tasks/{task_id}", params={"background": "true"}, json={"content": content})
+        assert response.status_code == 202
+        location = response.headers["Location"]
+        for _ in range(200):
+            job = (await client.get(location)).json()
+            if job["status"] not in ("queued", "running"):
+                return job
+            await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_job_for_missing_task_fails(api):
+    job = asyncio.run(_run_job(api, "missing", "read x"))
+    assert job["status"] == "failed"
+    assert job["error"] == "Task not found"
+
+
+def test_job_without_an_agent_fails(api):
+    task_id = api.planner.create_task("prompt")
+    job = asyncio.run(_run_job(api, task_id, "nothing matches this"))
+    assert job["status"] == "failed"
+
+
+def test_successful_job_completes(api, tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("hello")
+    task_id = api.planner.create_task("prompt")
+    job = asyncio.run(_run_job(api, task_id, f"read {path}"))
+    assert job["status"] == "completed"
+    assert job["result"] == "hello"
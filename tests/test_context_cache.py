@@ -0,0 +1,173 @@
+"""Context cache backends: coherence with ContextManager writes and eviction."""
+
+from __future__ import annotations
+
+import fnmatch
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from src.jarvis.context_cache import LRUContextCache, RedisContextCache
+from src.jarvis.context_manager import ContextManager
+from src.jarvis.utils.loop import get_runner
+
+
+class FakeRedis:
+    """In-process stand-in for the redis-py calls ``RedisContextCache`` makes."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if nx and key in self.values:
+            return None
+        self.values[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def incr(self, key: str) -> int:
+        value = int(self.values.get(key, b"0")) + 1
+        self.values[key] = str(value).encode()
+        return value
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match: str) -> List[str]:
+        return [key for key in self.values if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def close(self) -> None:
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.calls: List[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args, **kwargs: self.calls.append((getattr(self.client, name), args, kwargs))
+
+    def execute(self) -> List[Any]:
+        return [fn(*args, **kwargs) for fn, args, kwargs in self.calls]
+
+
+BACKENDS = {
+    "lru": lambda: LRUContextCache(),
+    "redis": lambda: RedisContextCache(client=FakeRedis()),
+}
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def cm(request):
+    manager = ContextManager("sqlite:///:memory:", cache=BACKENDS[request.param]())
+    yield manager
+    manager.close()
+
+
+def run(coro):
+    return get_runner().run(coro)
+
+
+def test_reads_see_task_writes(cm):
+    assert run(cm.get_task("t")) is None
+    run(cm.create_task("t", "prompt"))
+    assert run(cm.get_task("t")).status == "pending"
+    run(cm.update_status("t", "running"))
+    assert run(cm.get_task("t")).status == "running"
+    assert cm.get_task_record("t").status == "running"
+
+
+def test_reads_see_chunk_writes(cm):
+    run(cm.create_task("t", "prompt"))
+    for n in range(3):
+        assert len(run(cm.get_chunks("t"))) == n
+        assert run(cm.get_task_history("t")) == [f"chunk {i}" for i in range(n)]
+        assert len(run(cm.get_recent_chunks("t", 1000))) == n
+        assert len(run(cm.get("t")).history) == n
+        run(cm.add_chunk("t", f"chunk {n}"))
+    hits = cm.cache.hits
+    assert run(cm.get_task_history("t")) == run(cm.get_task_history("t"))
+    assert cm.cache.hits == hits + 1
+
+
+def test_reads_see_summary_writes(cm):
+    run(cm.create_task("t", "prompt"))
+    assert run(cm.get_latest_summary("t")) is None
+    run(cm.add_summary("t", "summary", 3))
+    assert run(cm.get_latest_summary("t")).content == "summary"
+
+
+def test_reads_see_transactions(cm):
+    run(cm.create_task("t", "prompt"))
+    run(cm.get_task_history("t"))
+    run(cm.get_task("t"))
+
+    async def batch() -> None:
+        async with cm.transaction() as uow:
+            uow.add_chunk("t", "chunk")
+            uow.update_status("t", "completed")
+
+    run(batch())
+    assert run(cm.get_task_history("t")) == ["chunk"]
+    assert run(cm.get_task("t")).status == "completed"
+
+
+def test_reads_see_leases(cm):
+    run(cm.create_task("q", "prompt"))
+    assert run(cm.get_task("q")).status == "pending"
+    claimed = run(cm.claim_tasks("worker"))
+    assert run(cm.get_task("q")).lease_owner == claimed[0].lease_owner
+    run(cm.release_task("q", claimed[0].lease_owner))
+    assert run(cm.get_task("q")).status == "completed"
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_read_started_before_invalidation_is_not_served(backend):
+    cache = BACKENDS[backend]()
+    generation = cache.generation("chunks:t")
+    cache.invalidate("chunks:t")
+    cache.set("ctx:t", "stale", "chunks:t", generation)
+    assert cache.get("ctx:t", "chunks:t") is None
+
+
+def test_redis_invalidation_covers_other_processes():
+    server = FakeRedis()
+    reader, writer = RedisContextCache(client=server), RedisContextCache(client=server)
+    generation = reader.generation("chunks:t")
+    writer.invalidate("chunks:t")
+    reader.set("ctx:t", "stale", "chunks:t", generation)
+    assert reader.get("ctx:t", "chunks:t") is None
+
+    reader.set("ctx:t", "fresh", "chunks:t", reader.generation("chunks:t"))
+    assert writer.get("ctx:t", "chunks:t") == ("fresh",)
+    writer.invalidate("chunks:t")
+    assert reader.get("ctx:t", "chunks:t") is None
+
+
+def test_redis_evicted_generation_is_a_miss():
+    server = FakeRedis()
+    cache = RedisContextCache(client=server)
+    cache.set("ctx:t", "value", "chunks:t")
+    server.delete(cache._generation_key("chunks:t"))
+    assert cache.get("ctx:t", "chunks:t") is None
+
+
+def test_lru_stays_within_its_byte_budget():
+    cache = LRUContextCache(max_bytes=10_000, max_entry_bytes=2_000)
+    for n in range(100):
+        cache.set(f"k{n}", "x" * 500, "tag")
+    assert cache.stats()["bytes"] <= 10_000
+    assert cache.get("k99", "tag") == ("x" * 500,)
+    assert cache.get("k0", "tag") is None
+    cache.set("big", "x" * 5_000, "tag")
+    assert cache.get("big", "tag") is None
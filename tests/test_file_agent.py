@@ -0,0 +1,37 @@
+"""FileAgent read argument parsing."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.jarvis.agents.base import TaskRequest
+from src.jarvis.agents.file import FileAgent
+
+
+@pytest.mark.parametrize(
+    "argument, expected",
+    [
+        (r"C:\logs\app.log", (r"C:\logs\app.log", 0, None)),
+        (r"C:\logs\app.log --limit 10", (r"C:\logs\app.log", 0, 10)),
+        ("don't.txt", ("don't.txt", 0, None)),
+        ("--offset 5 my notes.txt --limit 3", ("my notes.txt", 5, 3)),
+        ('"my notes.txt" --offset 2', ("my notes.txt", 2, None)),
+        ("a.txt --limit 1 --limit 7", ("a.txt", 0, 7)),
+        ("a--limit.txt", ("a--limit.txt", 0, None)),
+    ],
+)
+def test_parse_read_args_keeps_the_path_verbatim(argument, expected):
+    assert FileAgent._parse_read_args(argument) == expected
+
+
+@pytest.mark.parametrize("argument", ["a.txt --limit -1", "a.txt --offset x"])
+def test_parse_read_args_rejects_bad_values(argument):
+    with pytest.raises(ValueError):
+        FileAgent._parse_read_args(argument)
+
+
+def test_read_path_with_apostrophe(tmp_path):
+    path = tmp_path / "don't.txt"
+    path.write_text("hello world")
+    response = FileAgent().handle(TaskRequest(task_id="t", content=f"read {path} --offset 6"))
+    assert response.content == "world"
@@ -0,0 +1,119 @@
+"""LLMClient fallback, circuit breaking, hedging and deadlines with fake backends."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src.jarvis.services.llm_client import LLMClient
+from src.jarvis.services.resilience import CircuitBreaker, DeadlineExceeded
+from src.jarvis.tier_selector import TierSelector
+
+
+class FakeBackend:
+    def __init__(self, name: str, latency: float = 0.0, fail: bool = False) -> None:
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError(f"{self.name} unavailable")
+        return self.name
+
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(primary: FakeBackend, backup: FakeBackend, **kwargs) -> LLMClient:
+        client = LLMClient(
+            tier_selector=TierSelector(), ollama=primary, bedrock=backup, chat_model=object(), **kwargs
+        )
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_primary_answers_when_healthy(make_client):
+    primary, backup = FakeBackend("primary"), FakeBackend("backup")
+    client = make_client(primary, backup)
+    assert client.generate("local", "hello") == "primary"
+    assert backup.calls == 0
+
+
+def test_failed_primary_falls_back(make_client):
+    primary, backup = FakeBackend("primary", fail=True), FakeBackend("backup")
+    client = make_client(primary, backup)
+    assert client.generate("local", "hello") == "backup"
+    assert primary.calls == 1
+
+
+def test_breaker_stops_calling_a_failing_backend(make_client):
+    primary, backup = FakeBackend("primary", fail=True), FakeBackend("backup")
+    client = make_client(primary, backup, failure_threshold=3, recovery_timeout=0.2)
+    for _ in range(10):
+        assert client.generate("local", "hello") == "backup"
+    assert primary.calls == 3
+    assert client.backends["ollama"].breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.25)
+    primary.fail = False
+    assert client.generate("local", "hello") == "primary"
+    assert client.backends["ollama"].breaker.state == CircuitBreaker.CLOSED
+
+
+def test_hedged_call_returns_the_faster_answer(make_client):
+    primary, backup = FakeBackend("primary", latency=1.0), FakeBackend("backup", latency=0.01)
+    client = make_client(primary, backup, hedge=True, hedge_after=0.05)
+    start = time.perf_counter()
+    assert client.generate("local", "hello") == "backup"
+    assert time.perf_counter() - start < 0.5
+    assert primary.calls == 1
+
+
+def test_unhedged_call_waits_for_the_primary(make_client):
+    primary, backup = FakeBackend("primary", latency=0.2), FakeBackend("backup")
+    client = make_client(primary, backup)
+    assert client.generate("local", "hello") == "primary"
+    assert backup.calls == 0
+
+
+def test_deadline_bounds_the_whole_call(make_client):
+    primary, backup = FakeBackend("primary", latency=1.0), FakeBackend("backup", latency=1.0)
+    client = make_client(primary, backup)
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        client.generate("local", "hello", deadline=0.1)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_client_timeout_applies_when_set(make_client):
+    primary, backup = FakeBackend("primary", latency=1.0), FakeBackend("backup", latency=1.0)
+    client = make_client(primary, backup, timeout=0.1)
+    with pytest.raises(DeadlineExceeded):
+        client.generate("local", "hello")
+
+
+def test_slow_call_is_not_cut_off_by_default(make_client):
+    primary, backup = FakeBackend("primary", latency=0.3), FakeBackend("backup")
+    client = make_client(primary, backup)
+    assert client.timeout is None
+    assert client.generate("local", "hello") == "primary"
+
+
+def test_error_of_last_backend_surfaces(make_client):
+    primary, backup = FakeBackend("primary", fail=True), FakeBackend("backup", fail=True)
+    client = make_client(primary, backup)
+    with pytest.raises(ConnectionError, match="backup"):
+        client.generate("local", "hello")
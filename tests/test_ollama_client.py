@@ -0,0 +1,148 @@
+"""OllamaClient against a stub Ollama server on a local port."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Set, Tuple
+
+import pytest
+import requests
+
+from src.jarvis.services.ollama import OllamaClient
+
+
+class StubOllama:
+    """Threaded HTTP/1.1 server answering ``POST /api/generate``.
+
+    Each request pops the next action from ``script``: an HTTP status, or
+    ``("sleep", seconds)`` before answering 200. Once the script is empty
+    every request gets an immediate 200.
+    """
+
+    def __init__(self) -> None:
+        self.script: List[object] = []
+        self.requests = 0
+        self.connections: Set[Tuple[str, int]] = set()
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True  # headers and body are separate writes
+
+            def log_message(self, format: str, *args: object) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests += 1
+                    stub.connections.add(self.client_address)
+                    action = stub.script.pop(0) if stub.script else 200
+                if isinstance(action, tuple):
+                    time.sleep(action[1])
+                    action = 200
+                payload = json.dumps({"model": body["model"], "response": "ok", "done": True}).encode()
+                self.send_response(action)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubOllama()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_client(stub):
+    clients = []
+
+    def make(**kwargs) -> OllamaClient:
+        kwargs.setdefault("backoff_factor", 0.01)
+        client = OllamaClient(host=stub.url, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_sequential_calls_reuse_one_connection(stub, make_client):
+    client = make_client()
+    for _ in range(20):
+        assert client.generate("hello") == "ok"
+    assert stub.requests == 20
+    assert len(stub.connections) == 1
+
+
+def test_concurrent_calls_stay_within_the_pool(stub, make_client):
+    client = make_client(pool_size=4)
+
+    async def burst() -> List[str]:
+        return await asyncio.gather(*(client.agenerate("hello") for _ in range(16)))
+
+    assert asyncio.run(burst()) == ["ok"] * 16
+    assert stub.requests == 16
+    assert len(stub.connections) <= 4
+
+
+@pytest.mark.parametrize("status", [502, 503, 504])
+def test_gateway_errors_are_retried(stub, make_client, status):
+    client = make_client(retries=2)
+    stub.script = [status, status]
+    assert client.generate("hello") == "ok"
+    assert stub.requests == 3
+
+
+def test_retries_back_off(stub, make_client):
+    client = make_client(retries=2, backoff_factor=0.1)
+    stub.script = [503, 503]
+    start = time.perf_counter()
+    client.generate("hello")
+    assert time.perf_counter() - start >= 0.1
+
+
+def test_error_surfaces_once_retries_are_used_up(stub, make_client):
+    client = make_client(retries=2)
+    stub.script = [503] * 10
+    with pytest.raises(requests.HTTPError) as excinfo:
+        client.generate("hello")
+    assert excinfo.value.response.status_code == 503
+    assert stub.requests == 3
+
+
+def test_client_errors_are_not_retried(stub, make_client):
+    client = make_client(retries=2)
+    stub.script = [400]
+    with pytest.raises(requests.HTTPError):
+        client.generate("hello")
+    assert stub.requests == 1
+
+
+def test_slow_generation_times_out_without_replay(stub, make_client):
+    client = make_client(read_timeout=0.2)
+    stub.script = [("sleep", 1.0)]
+    start = time.perf_counter()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.generate("hello")
+    assert time.perf_counter() - start < 0.8
+    assert stub.requests == 1
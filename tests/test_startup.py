@@ -0,0 +1,57 @@
+"""The CLI must start without importing the heavy parts of the stack."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that must only be imported once a command actually needs them.
+HEAVY_MODULES = {
+    "sqlalchemy",
+    "sqlmodel",
+    "langchain",
+    "langchain_community",
+    "boto3",
+    "chromadb",
+    "numpy",
+    "requests",
+    "rich.markdown",
+}
+
+
+def imported_modules(module: str) -> set[str]:
+    """Names of the modules ``import module`` loads, via ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+def test_cli_import_skips_heavy_modules():
+    modules = imported_modules("src.jarvis.cli")
+    assert "src.jarvis.cli" in modules
+    assert not modules & HEAVY_MODULES
+
+
+def test_cli_help_runs_without_a_database(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-m", "src.jarvis.cli", "--help"],
+        cwd=tmp_path,
+        env=dict(os.environ, PYTHONPATH=str(ROOT)),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert not list(tmp_path.iterdir())